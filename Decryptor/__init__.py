@@ -0,0 +1,63 @@
+"""
+PyInstaller加密字节码(.pyc.encrypted)的解密
+
+schemes登记PyInstaller各版本的加密方案，backends登记可用的AES实现，engine负责并行解密，
+keys从密钥模块与引导模块的常量中查找候选密钥，detect通过试解密确定密钥与方案，
+search在密钥模块被删除时多进程暴力搜索可执行文件与解包目录中的可打印串；decrypt_pyinstaller_lt4/ge4为旧接口，分别对应cfb与ctr方案
+"""
+import os
+
+# 各Python版本的pyc头(魔数 + 补零的标志位/时间戳/大小字段)
+MAGIC_HEADERS = {
+    "2.7": b'\x03\xf3\x0d\x0a\0\0\0\0',
+    "3.0": b'\x3b\x0c\x0d\x0a\0\0\0\0',
+    "3.1": b'\x4f\x0c\x0d\x0a\0\0\0\0',
+    "3.2": b'\x6c\x0c\x0d\x0a\0\0\0\0',
+    "3.3": b'\x9e\x0c\x0d\x0a\0\0\0\0\0\0\0\0',
+    "3.4": b'\xee\x0c\x0d\x0a\0\0\0\0\0\0\0\0',
+    "3.5": b'\x17\x0d\x0d\x0a\0\0\0\0\0\0\0\0',
+    "3.6": b'\x33\x0d\x0d\x0a\0\0\0\0\0\0\0\0',
+    "3.7": b'\x42\x0d\x0d\x0a\0\0\0\0\0\0\0\0\0\0\0\0',
+    "3.8": b'\x55\x0d\x0d\x0a\0\0\0\0\0\0\0\0\0\0\0\0',
+    "3.9": b'\x61\x0d\x0d\x0a\0\0\0\0\0\0\0\0\0\0\0\0',
+    "3.10": b'\x6f\x0d\x0d\x0a\0\0\0\0\0\0\0\0\0\0\0\0',
+    "3.11": b'\xa7\x0d\x0d\x0a\0\0\0\0\0\0\0\0\0\0\0\0',
+    "3.12": b'\xcb\x0d\x0d\x0a\0\0\0\0\0\0\0\0\0\0\0\0',
+    "3.13": b'\xf3\x0d\x0d\x0a\0\0\0\0\0\0\0\0\0\0\0\0'
+}
+
+from Decryptor.backends import BACKENDS, register_backend, backends_for, get_backend, fastest_backend
+from Decryptor.schemes import SCHEMES, Scheme, SchemeCipher, register_scheme, get_scheme
+from Decryptor.engine import CRYPT_BLOCK_SIZE, DecryptResult, DecryptionEngine, decrypt_file, output_path_for
+from Decryptor.detect import read_probes, detect_settings, detect_python_version
+from Decryptor.keys import find_key_candidates
+from Decryptor.search import search_keys
+from PyInstExtractor.container import split_member_path
+
+
+def decrypt_pyc_files(encrypted_files, key, python_version, scheme, output_dir=None, workers=None, callback=None, cancel_event=None,
+                      backend=None, processes=False):
+    """
+    并行解密.pyc.encrypted文件，返回(成功数, [(文件, 失败原因), ...])
+
+    参数:
+        encrypted_files: 加密文件路径列表，也可以是解包容器的成员路径(见PyInstExtractor.container.find_members)
+        key: AES密钥(bytes)
+        python_version: 写入pyc头所用的Python版本，如"3.8"
+        scheme: 加密方案，cfb(PyInstaller < 4.0)或ctr(PyInstaller >= 4.0)
+        output_dir: 输出目录，默认为各文件所在目录下的extract文件夹，容器成员为容器文件所在目录下的extract文件夹
+        workers: 并行数，默认为CPU核心数
+        callback, cancel_event, processes: 见DecryptionEngine
+        backend: AES实现名，默认选用本机最快的实现
+    """
+    if python_version not in MAGIC_HEADERS:
+        raise ValueError(f"不支持的Python版本: {python_version}。支持的版本有: {', '.join(MAGIC_HEADERS.keys())}")
+
+    engine = DecryptionEngine(SchemeCipher(scheme, backend), key, MAGIC_HEADERS[python_version], workers, processes, cancel_event)
+    def default_output_dir(encrypted_file):
+        member = split_member_path(encrypted_file)
+        return os.path.join(os.path.dirname(member[0] if member else encrypted_file), "extract")
+
+    jobs = [(encrypted_file, output_path_for(encrypted_file, output_dir or default_output_dir(encrypted_file)))
+            for encrypted_file in encrypted_files]
+    return engine.run(jobs, callback)
@@ -0,0 +1,112 @@
+import os
+import time
+from functools import lru_cache
+
+try:
+    from Crypto.Cipher import AES
+except ImportError:
+    AES = None
+
+try:
+    import tinyaes
+except ImportError:
+    tinyaes = None
+
+try:
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+except ImportError:
+    Cipher = None
+
+
+# AES实现注册表：{实现名: {模式: decrypt(key, iv, data)}}，只登记当前环境中可以导入的实现；
+# 模式名为ctr(128位大端计数器，初值为IV)与cfb8(8位分段的CFB，即PyCrypto的默认CFB)
+BACKENDS = {}
+
+# 测速所用的数据量
+BENCHMARK_SIZE = 256 * 1024
+
+# 按小数据测速时的调用次数上限
+BENCHMARK_CALLS = 256
+
+
+def register_backend(name, modes):
+    """登记一个AES实现，modes为{模式: decrypt(key, iv, data)}，解密函数需为模块级函数以便交给进程池"""
+    BACKENDS[name] = dict(modes)
+    fastest_backend.cache_clear()
+
+
+def backends_for(mode):
+    """支持该模式的实现名，按登记顺序"""
+    return [name for name, funcs in BACKENDS.items() if mode in funcs]
+
+
+def get_backend(mode, name=None):
+    """
+    返回指定实现中该模式的解密函数
+
+    name为空时选用本机处理大块数据最快的实现；没有可用实现时抛出RuntimeError
+    """
+    name = name or fastest_backend(mode)
+    if name not in BACKENDS:
+        raise RuntimeError(f"AES实现 {name} 不可用，可用的实现有: {', '.join(BACKENDS) or '无'}")
+    if mode not in BACKENDS[name]:
+        raise RuntimeError(f"AES实现 {name} 不支持{mode}模式")
+    return BACKENDS[name][mode]
+
+
+@lru_cache(maxsize=None)
+def fastest_backend(mode, size=None):
+    """
+    返回支持该模式的实现中最快的实现名，结果在进程内缓存
+
+    size为空时比较解密一次BENCHMARK_SIZE字节的耗时；给出size时比较多次解密size字节的耗时，
+    此时创建密钥对象的开销占主导，适合试解密大量候选密钥
+    """
+    names = backends_for(mode)
+    if not names:
+        raise RuntimeError(f"没有支持{mode}模式的AES实现，请安装 pycryptodome 或 tinyaes")
+    if len(names) == 1:
+        return names[0]
+
+    calls = min(BENCHMARK_CALLS, BENCHMARK_SIZE // size) if size else 1
+    key, iv, data = os.urandom(16), os.urandom(16), os.urandom(size or BENCHMARK_SIZE)
+    timings = []
+    for name in names:
+        decrypt = BACKENDS[name][mode]
+        start = time.perf_counter()
+        for _ in range(calls):
+            decrypt(key, iv, data)
+        timings.append((time.perf_counter() - start, name))
+    return min(timings)[1]
+
+
+def _pycryptodome_ctr(key, iv, data):
+    return AES.new(key, AES.MODE_CTR, nonce=b'', initial_value=iv).decrypt(data)
+
+
+def _pycryptodome_cfb8(key, iv, data):
+    return AES.new(key, AES.MODE_CFB, iv).decrypt(data)
+
+
+def _tinyaes_ctr(key, iv, data):
+    return tinyaes.AES(key, iv).CTR_xcrypt_buffer(data)
+
+
+def _cryptography_ctr(key, iv, data):
+    decryptor = Cipher(algorithms.AES(key), modes.CTR(iv)).decryptor()
+    return decryptor.update(data) + decryptor.finalize()
+
+
+def _cryptography_cfb8(key, iv, data):
+    decryptor = Cipher(algorithms.AES(key), modes.CFB8(iv)).decryptor()
+    return decryptor.update(data) + decryptor.finalize()
+
+
+if Cipher is not None:
+    register_backend('cryptography', {'ctr': _cryptography_ctr, 'cfb8': _cryptography_cfb8})
+
+if AES is not None:
+    register_backend('pycryptodome', {'ctr': _pycryptodome_ctr, 'cfb8': _pycryptodome_cfb8})
+
+if tinyaes is not None:
+    register_backend('tinyaes', {'ctr': _tinyaes_ctr})
@@ -0,0 +1,119 @@
+import os
+import zlib
+from collections import Counter
+
+from Decryptor import MAGIC_HEADERS
+from Decryptor.backends import backends_for
+from Decryptor.engine import CRYPT_BLOCK_SIZE
+from Decryptor.schemes import SCHEMES, SchemeCipher
+from PyInstExtractor.pyzcrypt import looks_like_zlib, pad_key
+
+
+# 试解密的密文长度：两个AES块足以覆盖zlib头与第一个deflate块头
+PROBE_SIZE = 32
+
+# 默认取样的加密文件数，每个候选须在全部样本上通过校验，降低zlib头的偶然命中
+PROBE_COUNT = 3
+
+
+def could_be_zlib(prefix):
+    """明文开头的若干字节能否是zlib头，只有一个字节时仅检查CMF(压缩方法8，窗口不超过32K)"""
+    if len(prefix) >= 2:
+        return looks_like_zlib(prefix)
+    return len(prefix) == 1 and prefix[0] & 0x0f == 8 and prefix[0] >> 4 <= 7
+
+
+def normalize_key(key):
+    """将候选密钥按PyInstaller的规则补齐(见pad_key)，长度不是AES密钥长度时返回None"""
+    key = pad_key(key)
+    return key if len(key) in (16, 24, 32) else None
+
+
+def read_probes(encrypted_files, count=PROBE_COUNT):
+    """读取至多count个加密文件开头的IV与密文，过短的文件跳过"""
+    probes = []
+    for encrypted_file in encrypted_files:
+        try:
+            with open(encrypted_file, 'rb') as f:
+                probe = f.read(CRYPT_BLOCK_SIZE + PROBE_SIZE)
+        except OSError:
+            continue
+        if len(probe) > CRYPT_BLOCK_SIZE + 2:
+            probes.append(probe)
+            if len(probes) >= count:
+                break
+    return probes
+
+
+def check_probe(cipher, key, probe):
+    """用cipher试解密一个样本，明文须以合法的zlib头开头且其后的deflate数据能被解析"""
+    try:
+        plaintext = cipher(key, probe[:CRYPT_BLOCK_SIZE], probe[CRYPT_BLOCK_SIZE:])
+    except ValueError:
+        return False
+    if not looks_like_zlib(plaintext):
+        return False
+    try:
+        zlib.decompressobj().decompress(plaintext)
+    except zlib.error:
+        return False
+    return True
+
+
+def available_schemes():
+    """当前环境中有可用AES实现的加密方案名"""
+    return [name for name, scheme in SCHEMES.items() if backends_for(scheme.mode)]
+
+
+def detect_settings(keys, probes, schemes=None):
+    """
+    依次试解密，确定密钥与加密方案
+
+    参数:
+        keys: 候选密钥(str或bytes)的可迭代对象
+        probes: read_probes返回的样本
+        schemes: 参与尝试的方案名，默认为全部可用方案
+
+    返回:
+        (密钥bytes, 方案名)，没有候选能解密全部样本时返回(None, None)
+    """
+    if not probes:
+        return None, None
+    ciphers = [(name, SchemeCipher(name)) for name in (schemes or available_schemes())]
+
+    seen = set()
+    for key in keys:
+        key = normalize_key(key)
+        if key is None or key in seen:
+            continue
+        seen.add(key)
+        for name, cipher in ciphers:
+            if all(check_probe(cipher, key, probe) for probe in probes):
+                return key, name
+    return None, None
+
+
+def detect_python_version(directory, limit=64):
+    """
+    根据目录中pyc文件的魔数确定Python版本，返回MAGIC_HEADERS中的版本号，无法确定时返回None
+
+    至多读取limit个文件的前4字节，取出现次数最多的版本
+    """
+    versions = {header[:4]: version for version, header in MAGIC_HEADERS.items()}
+    votes = Counter()
+    checked = 0
+    for root, _, files in os.walk(directory):
+        for filename in files:
+            if not filename.endswith('.pyc'):
+                continue
+            try:
+                with open(os.path.join(root, filename), 'rb') as f:
+                    magic = f.read(4)
+            except OSError:
+                continue
+            if magic in versions:
+                votes[versions[magic]] += 1
+            checked += 1
+            if checked >= limit:
+                return votes.most_common(1)[0][0] if votes else None
+    return votes.most_common(1)[0][0] if votes else None
@@ -0,0 +1,175 @@
+import os
+import zlib
+import threading
+from collections import namedtuple, deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from PyInstExtractor.container import open_container, split_member_path
+from PyInstExtractor.pyzcrypt import CRYPT_BLOCK_SIZE
+
+# 单个文件的解密结果：error为None表示成功，否则为失败原因
+DecryptResult = namedtuple('DecryptResult', 'source output error')
+
+
+def output_path_for(encrypted_file, out_dir):
+    """解密结果的输出路径：xxx.pyc.encrypted输出为xxx.pyc，其他文件追加.decrypted后缀"""
+    base_name = os.path.basename(encrypted_file)
+    if base_name.endswith('.pyc.encrypted'):
+        output_name = base_name[:-10]
+    else:
+        output_name = base_name + ".decrypted"
+    return os.path.join(out_dir, output_name)
+
+
+def read_member(source, containers):
+    """
+    source为解包容器的成员路径(见container.member_path)时读出其内容，否则返回None
+
+    containers为{容器路径: 已打开的容器}缓存，同一容器只打开一次，由调用方负责关闭；成员不存在时返回None
+    """
+    member = split_member_path(source)
+    if member is None:
+        return None
+    try:
+        if member[0] not in containers:
+            containers[member[0]] = open_container(member[0])
+        return containers[member[0]].read(member[1])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def decrypt_file(source, output, cipher, key, magic_header, data=None):
+    """
+    解密并解压单个.pyc.encrypted文件，写出带pyc头的文件，可在工作线程或子进程中执行
+
+    cipher为cipher(key, iv, data)形式的模块级函数，返回解密后的数据；data为已读出的内容(如容器成员)，
+    为None时从source读取；失败时不写出输出文件
+    """
+    try:
+        if data is None:
+            if not os.path.exists(source):
+                return DecryptResult(source, output, "文件不存在")
+
+            with open(source, 'rb') as f:
+                data = f.read()
+        plaintext = zlib.decompress(cipher(key, data[:CRYPT_BLOCK_SIZE], data[CRYPT_BLOCK_SIZE:]))
+
+        out_dir = os.path.dirname(output)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        with open(output, 'wb') as f:
+            f.write(magic_header)
+            f.write(plaintext)
+
+        return DecryptResult(source, output, None)
+
+    except Exception as e:
+        return DecryptResult(source, output, str(e))
+
+
+class DecryptionEngine:
+    """
+    并行解密引擎：用线程池(或进程池)批量解密.pyc.encrypted文件
+
+    源文件也可以是解包容器(zip/tar/sqlite)的成员路径，成员在调用线程中读出后交给工作线程
+
+    参数:
+        cipher: 模块级解密函数cipher(key, iv, data)，使用进程池时必须可被pickle
+        key: AES密钥(bytes)
+        magic_header: 写在解密结果前的pyc头
+        workers: 并行数，默认为CPU核心数
+        processes: 为True时使用进程池，适合AES实现不释放GIL的情况
+        cancel_event: 外部的threading.Event，置位后不再提交新文件
+    """
+
+    def __init__(self, cipher, key, magic_header, workers=None, processes=False, cancel_event=None):
+        self.cipher = cipher
+        self.key = key
+        self.magic_header = magic_header
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.processes = processes
+        self.cancel_event = cancel_event or threading.Event()
+
+    def cancel(self):
+        """请求取消：已提交的文件会处理完毕，其余文件不再解密"""
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def imap(self, jobs):
+        """
+        并行处理(源文件, 输出路径)序列，按完成顺序产出DecryptResult
+
+        同时在途的文件数不超过workers的4倍，文件数量很大时也不会一次性提交全部任务；
+        输出路径相同的文件(如多个__init__.pyc)按输入顺序依次处理，前一个完成后才提交下一个，
+        与串行处理一样由最后一个写出的文件生效，不会交错写入同一文件
+        """
+        pool = ProcessPoolExecutor if self.processes else ThreadPoolExecutor
+        executor = pool(max_workers=self.workers)
+        window = self.workers * 4
+        jobs = iter(jobs)
+        pending = {}
+        # 输出路径 -> 等待该路径上在途文件完成的后续文件
+        waiting = {}
+        queued = 0
+        containers = {}
+
+        def submit(job, target):
+            future = executor.submit(decrypt_file, job[0], job[1], self.cipher, self.key, self.magic_header,
+                                     read_member(job[0], containers))
+            pending[future] = target
+
+        try:
+            while True:
+                while not self.cancelled and len(pending) + queued < window:
+                    job = next(jobs, None)
+                    if job is None:
+                        break
+                    target = os.path.normcase(os.path.abspath(job[1]))
+                    if target in waiting:
+                        waiting[target].append(job)
+                        queued += 1
+                    else:
+                        waiting[target] = deque()
+                        submit(job, target)
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    target = pending.pop(future)
+                    if waiting[target] and not self.cancelled:
+                        queued -= 1
+                        submit(waiting[target].popleft(), target)
+                    else:
+                        del waiting[target]
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+            for c in containers.values():
+                c.close()
+
+    def run(self, jobs, callback=None):
+        """
+        解密全部文件，返回(成功数, [(文件, 失败原因), ...])
+
+        callback(result, done, total)在调用线程中对每个完成的文件调用一次，可用于刷新进度
+        """
+        jobs = list(jobs)
+        success_count = 0
+        failed_files = []
+
+        for done, result in enumerate(self.imap(jobs), 1):
+            if result.error is None:
+                success_count += 1
+            else:
+                failed_files.append((result.source, result.error))
+            if callback:
+                callback(result, done, len(jobs))
+
+        return success_count, failed_files
@@ -0,0 +1,81 @@
+import os
+import sys
+import marshal
+
+from Decryptor import MAGIC_HEADERS
+from PyInstExtractor import pymarshal
+from PyInstExtractor.pyzcrypt import KEY_MODULE, iter_module_keys
+
+
+# 可能内嵌密钥的归档与引导模块
+BOOTSTRAP_PREFIXES = ('pyimod', 'pyiboot')
+
+_VERSIONS = {header[:4]: version for version, header in MAGIC_HEADERS.items()}
+
+
+def unmarshal_pyc(data):
+    """
+    按pyc头中的魔数反序列化代码对象，版本与当前解释器不同时使用pymarshal
+
+    无法识别魔数时抛出ValueError
+    """
+    version = _VERSIONS.get(bytes(data[:4]))
+    if version is None:
+        raise ValueError('unknown pyc magic {0}'.format(bytes(data[:4]).hex()))
+
+    body = data[len(MAGIC_HEADERS[version]):]
+    major, minor = (int(part) for part in version.split('.'))
+    if (major, minor) == sys.version_info[:2]:
+        return marshal.loads(body)
+    return pymarshal.loads(body, (major, minor))
+
+
+def iter_key_candidates(path):
+    """
+    读取一个pyc文件中可能是AES密钥的字符串常量
+
+    密钥模块中任意长度不超过32的字符串都是候选，其他模块只取16/24/32字节的字符串；规则与解包器共用(见pyzcrypt)
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    yield from iter_module_keys(data, unmarshal_pyc, os.path.basename(path).startswith(KEY_MODULE))
+
+
+def find_key_candidates(directory):
+    """
+    在解包目录中查找AES密钥候选，不需要反编译器
+
+    依次检查pyimod00_crypto_key、其余pyimod/pyiboot引导模块、以及内容提到crypto_key的其他pyc，
+    返回去重后的候选列表(bytes)，越靠前越可能是密钥，可直接交给detect.detect_settings验证
+    """
+    key_modules, bootstrap, others = [], [], []
+    for root, _, files in os.walk(directory):
+        for filename in files:
+            if not filename.endswith('.pyc'):
+                continue
+            full_path = os.path.join(root, filename)
+            if filename.startswith(KEY_MODULE):
+                key_modules.append(full_path)
+            elif filename.startswith(BOOTSTRAP_PREFIXES):
+                bootstrap.append(full_path)
+            else:
+                others.append(full_path)
+
+    # 其他模块只在前两类都没有结果时才按内容筛选
+    candidates = []
+    for group in (key_modules, bootstrap, others):
+        for path in group:
+            try:
+                if group is others:
+                    with open(path, 'rb') as f:
+                        if b'crypto_key' not in f.read():
+                            continue
+                for key in iter_key_candidates(path):
+                    if key not in candidates:
+                        candidates.append(key)
+            except OSError:
+                continue
+        if candidates and group is not key_modules:
+            break
+
+    return candidates
@@ -0,0 +1,61 @@
+from collections import namedtuple
+
+from Decryptor.backends import get_backend, fastest_backend
+
+
+# PyInstaller加密方案：mode为所用的AES模式(见backends)；
+# prefix(block, ciphertext)由IV的单块加密结果block推出明文开头的若干字节，供密钥搜索快速筛选，可为None
+Scheme = namedtuple('Scheme', 'name mode description prefix')
+
+# 方案注册表：{方案名: Scheme}
+SCHEMES = {}
+
+
+def register_scheme(name, mode, description, prefix=None):
+    """登记一个加密方案，新的PyInstaller加密变体只需在此登记其AES模式"""
+    SCHEMES[name] = Scheme(name, mode, description, prefix)
+    return SCHEMES[name]
+
+
+def get_scheme(name):
+    if name not in SCHEMES:
+        raise ValueError(f"未知的加密方案: {name}。支持的方案有: {', '.join(SCHEMES)}")
+    return SCHEMES[name]
+
+
+class SchemeCipher:
+    """
+    按方案解密的可调用对象cipher(key, iv, data)，可直接交给DecryptionEngine
+
+    只保存方案名与实现名，可被pickle后在子进程中使用；backend为空时选用本机最快的实现
+    """
+
+    def __init__(self, scheme, backend=None):
+        mode = get_scheme(scheme).mode
+        self.scheme = scheme
+        # 提前解析，缺少依赖时在提交任务前报错，子进程中也不必重新测速
+        self.backend = backend or fastest_backend(mode)
+        self._decrypt = get_backend(mode, self.backend)
+
+    def __getstate__(self):
+        return {'scheme': self.scheme, 'backend': self.backend}
+
+    def __setstate__(self, state):
+        self.__init__(state['scheme'], state['backend'])
+
+    def __call__(self, key, iv, data):
+        return self._decrypt(key, iv, data)
+
+
+def _ctr_prefix(block, ciphertext):
+    # CTR的第一个密钥流块即为E(IV)
+    return bytes(a ^ b for a, b in zip(block, ciphertext[:len(block)]))
+
+
+def _cfb8_prefix(block, ciphertext):
+    # CFB8的第一个明文字节为E(IV)的首字节与首个密文字节异或
+    return bytes([block[0] ^ ciphertext[0]])
+
+
+register_scheme('cfb', 'cfb8', 'PyInstaller < 4.0: pycryptodome AES-CFB', _cfb8_prefix)
+register_scheme('ctr', 'ctr', 'PyInstaller >= 4.0: tinyaes AES-CTR', _ctr_prefix)
@@ -0,0 +1,162 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from Decryptor.backends import get_backend, fastest_backend
+from Decryptor.detect import available_schemes, check_probe, could_be_zlib, read_probes
+from Decryptor.engine import CRYPT_BLOCK_SIZE
+from Decryptor.schemes import SCHEMES, SchemeCipher
+
+
+# AES密钥长度
+KEY_LENGTHS = (16, 24, 32)
+
+# 大文件按段并行扫描，相邻段重叠一个最长密钥的长度，跨段的可打印串也能取到完整的候选
+SEGMENT_SIZE = 16 * 1024 * 1024
+SEGMENT_OVERLAP = max(KEY_LENGTHS)
+
+# 每个试解密任务包含的候选数
+CHUNK_SIZE = 4096
+
+# 候选密钥由可打印字符组成(不含空格与引号)。候选从每个串的开头以及串内的=:,;之后开始，
+# 如marshal中前面是类型码与长度字节(32字节字符串的长度恰为空格)、源码中前面是引号、配置文本中前面是key=。
+# 密钥之后可能紧跟可打印的下一个类型码，因此只取开头的16/24/32字节，而不枚举串内的全部窗口
+_KEY_BYTES = bytes(c for c in range(0x21, 0x7f) if c not in b'"\'')
+_SEPARATORS = b'=:,;'
+
+
+def _char_class(chars):
+    return b''.join(re.escape(bytes([c])) for c in chars)
+
+
+# 零宽匹配，同一个串内的多个候选起点可以重叠
+_KEY_RUN = re.compile(rb'(?<![%s])(?=([%s]{16})([%s]{8})?([%s]{8})?)' % (
+    _char_class(c for c in _KEY_BYTES if c not in _SEPARATORS), _char_class(_KEY_BYTES), _char_class(_KEY_BYTES), _char_class(_KEY_BYTES)))
+
+
+def iter_printable_keys(data):
+    """产出数据中每个候选起点之后的16/24/32字节(均为可打印字符)"""
+    for head, more, most in _KEY_RUN.findall(data):
+        yield head
+        if more:
+            yield head + more
+            if most:
+                yield head + more + most
+
+
+def _iter_segments(paths):
+    """将文件与目录展开为(文件, 起始, 结束)扫描段，跳过.encrypted文件"""
+    for path in paths:
+        if os.path.isdir(path):
+            files = (os.path.join(root, filename) for root, _, filenames in os.walk(path)
+                     for filename in filenames if not filename.endswith('.encrypted'))
+        else:
+            files = [path]
+
+        for file_path in files:
+            try:
+                size = os.path.getsize(file_path)
+            except OSError:
+                continue
+            for start in range(0, size, SEGMENT_SIZE):
+                yield file_path, start, min(start + SEGMENT_SIZE, size)
+
+
+def _scan_segment(path, start, end):
+    """
+    提取一个扫描段中的候选密钥，可在子进程中执行
+
+    起始于重叠区的串会被相邻两段重复提取，由调用方去重
+    """
+    try:
+        with open(path, 'rb') as f:
+            f.seek(start)
+            data = f.read(end - start + SEGMENT_OVERLAP)
+    except OSError:
+        return set()
+    return set(iter_printable_keys(data))
+
+
+def _encrypt_block(blocks, key, iv, zero):
+    """依次尝试各实现，返回E(iv)，全部实现都不支持该密钥长度时返回None"""
+    for block in blocks:
+        try:
+            return block(key, iv, zero)
+        except ValueError:
+            continue
+    return None
+
+
+def _test_chunk(keys, probes, schemes):
+    """
+    用一组候选密钥试解密样本，返回命中的(密钥, 方案)，可在子进程中执行
+
+    先用CTR模式解密16个零字节得到第一个样本IV的单块加密结果，各方案据此推出明文开头并检查zlib头，
+    每个候选只需一次单块运算；通过筛选的少数候选再按方案完整试解密全部样本。
+    小数据最快的实现(如tinyaes)可能只支持AES-128，24/32字节的候选改用通用实现
+    """
+    blocks = [get_backend('ctr', fastest_backend('ctr', CRYPT_BLOCK_SIZE)), get_backend('ctr')]
+    zero = bytes(CRYPT_BLOCK_SIZE)
+    iv, ciphertext = probes[0][:CRYPT_BLOCK_SIZE], probes[0][CRYPT_BLOCK_SIZE:]
+    ciphers = [(name, SCHEMES[name].prefix, SchemeCipher(name)) for name in schemes]
+
+    hits = []
+    for key in keys:
+        encrypted = _encrypt_block(blocks, key, iv, zero)
+        if encrypted is None:
+            continue
+        for name, prefix, cipher in ciphers:
+            if prefix is not None and not could_be_zlib(prefix(encrypted, ciphertext)):
+                continue
+            if all(check_probe(cipher, key, probe) for probe in probes):
+                hits.append((key, name))
+    return hits
+
+
+def search_keys(paths, encrypted_files, workers=None, schemes=None, first_only=True, callback=None):
+    """
+    在可执行文件与解包目录中暴力搜索PyInstaller的AES密钥，用于密钥模块被删除的样本
+
+    提取全部文件中可打印串(及串内=:,;之后)开头的16/24/32字节作为候选并去重，再用每个候选试解密几个加密文件的前两个AES块，
+    明文以合法zlib头开头即为命中；扫描与试解密均在进程池中进行
+
+    参数:
+        paths: 可执行文件或目录的列表
+        encrypted_files: .pyc.encrypted文件列表，从中取样
+        workers: 进程数，默认为CPU核心数
+        schemes: 参与尝试的方案名，默认为全部可用方案
+        first_only: 为True时找到第一个命中即停止
+        callback: callback(stage, done, total)，stage为scan或test，在调用线程中调用
+
+    返回:
+        [(密钥bytes, 方案名), ...]
+    """
+    probes = read_probes(encrypted_files)
+    if not probes:
+        return []
+    schemes = list(schemes or available_schemes())
+    segments = list(_iter_segments(paths))
+    workers = max(1, workers or os.cpu_count() or 1)
+
+    hits = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        candidates = set()
+        futures = [pool.submit(_scan_segment, *segment) for segment in segments]
+        for done, future in enumerate(as_completed(futures), 1):
+            candidates.update(future.result())
+            if callback:
+                callback('scan', done, len(futures))
+
+        candidates = list(candidates)
+        futures = [pool.submit(_test_chunk, candidates[i:i + CHUNK_SIZE], probes, schemes)
+                   for i in range(0, len(candidates), CHUNK_SIZE)]
+        for done, future in enumerate(as_completed(futures), 1):
+            hits.extend(future.result())
+            if callback:
+                callback('test', done, len(futures))
+            if hits and first_only:
+                for pending in futures:
+                    pending.cancel()
+                break
+
+    return hits
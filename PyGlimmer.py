@@ -8,7 +8,6 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QH
                            QGraphicsDropShadowEffect, QFrame, QDialog)
 from PyQt6.QtCore import Qt, QSize, QPropertyAnimation, QEasingCurve, pyqtProperty
 from PyQt6.QtGui import QFont, QColor, QPalette, QPixmap, QIcon
-import zlib
 import dis
 import marshal
 import struct
@@ -21,14 +20,17 @@ import ctypes
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 try:
-    from Decryptor.decrypt_pyinstaller_lt4 import decrypt_pyc_files as decrypt_lt4
-    from Decryptor.decrypt_pyinstaller_ge4 import decrypt_pyc_files as decrypt_ge4
-    DECRYPTION_AVAILABLE = True
+    from Decryptor import MAGIC_HEADERS, BACKENDS, SchemeCipher, DecryptionEngine, output_path_for
+    from Decryptor.detect import read_probes, detect_settings, detect_python_version
+    from Decryptor.keys import find_key_candidates
+    from Decryptor.search import search_keys
+    from PyInstExtractor.container import find_members
+    DECRYPTION_AVAILABLE = bool(BACKENDS)
 except ImportError:
     DECRYPTION_AVAILABLE = False
 
 try:
-    from PyInstExtractor.pyinstxtractor import PyInstArchive, normalize_path_for_display
+    from PyInstExtractor.pyinstxtractor import PyInstArchive, normalize_path_for_display, describe_progress
     PYINSTALLER_EXTRACTOR_AVAILABLE = True
 except ImportError:
     PYINSTALLER_EXTRACTOR_AVAILABLE = False
@@ -196,6 +198,7 @@ class PythonDecompilerApp(QMainWindow):
         self.encrypted_files = []
         self.batch_stop_flag = False
         self.batch_disasm_stop_flag = False
+        self.decrypt_engine = None
         
     def initUI(self):
         self.setWindowTitle('PyGlimmer  by: yoruaki  公众号：夜秋的小屋')
@@ -989,12 +992,17 @@ class PythonDecompilerApp(QMainWindow):
         self.encrypted_browse_dir_button.setStyleSheet(self.get_button_style())
         self.encrypted_browse_dir_button.clicked.connect(self.browse_encrypted_directory)
         
+        self.encrypted_browse_container_button = QPushButton("选择解包容器...")
+        self.encrypted_browse_container_button.setStyleSheet(self.get_button_style())
+        self.encrypted_browse_container_button.clicked.connect(self.browse_encrypted_container)
+        
         self.encrypted_clear_button = QPushButton("清空列表")
         self.encrypted_clear_button.setStyleSheet(self.get_button_style())
         self.encrypted_clear_button.clicked.connect(self.clear_encrypted_files)
         
         encrypted_button_layout.addWidget(self.encrypted_browse_button)
         encrypted_button_layout.addWidget(self.encrypted_browse_dir_button)
+        encrypted_button_layout.addWidget(self.encrypted_browse_container_button)
         encrypted_button_layout.addWidget(self.encrypted_clear_button)
         
         self.encrypted_files_list = QListWidget()
@@ -1055,10 +1063,37 @@ class PythonDecompilerApp(QMainWindow):
         self.decrypt_button.clicked.connect(self.decrypt_pyc_files)
         self.decrypt_button.setEnabled(False)
         
+        self.decrypt_stop_button = QPushButton("终止")
+        self.decrypt_stop_button.setStyleSheet("""
+            QPushButton {
+                background-color: #FF6B6B;
+                color: white;
+                border-radius: 5px;
+                padding: 5px 10px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #FF5252;
+            }
+            QPushButton:pressed {
+                background-color: #E53935;
+            }
+            QPushButton:disabled {
+                background-color: #D3D3D3;
+                color: #A9A9A9;
+            }
+        """)
+        self.decrypt_stop_button.clicked.connect(self.stop_decrypt)
+        self.decrypt_stop_button.setEnabled(False)
+        
+        decrypt_buttons_layout = QHBoxLayout()
+        decrypt_buttons_layout.addWidget(self.decrypt_button)
+        decrypt_buttons_layout.addWidget(self.decrypt_stop_button)
+        
         decrypt_layout.addWidget(decrypt_section)
         decrypt_layout.addWidget(encrypted_files_section)
         decrypt_layout.addWidget(decrypt_progress_section)
-        decrypt_layout.addWidget(self.decrypt_button)
+        decrypt_layout.addLayout(decrypt_buttons_layout)
         
         
         pyinstaller_tab = QWidget()
@@ -2186,6 +2221,28 @@ class PythonDecompilerApp(QMainWindow):
                 self.show_info("文件查找结果", "在所选文件夹中未找到加密的PYC文件")
                 self.decrypt_button.setEnabled(False)
     
+    def browse_encrypted_container(self):
+        container_path, _ = QFileDialog.getOpenFileName(
+            self, "选择解包容器", "", "解包容器 (*.zip *.tar *.sqlite *.db *.sqlite3);;所有文件 (*)"
+        )
+        
+        if container_path:
+            try:
+                encrypted_files = find_members(container_path, ('.pyc.encrypted', ))
+            except Exception as e:
+                self.show_error("容器错误", f"无法读取容器文件: {str(e)}")
+                return
+            # 容器成员以<容器文件>/<成员名>的形式加入列表，解密时直接从容器读取
+            self.encrypted_base_dir = container_path
+            if encrypted_files:
+                self.encrypted_files.extend(encrypted_files)
+                self.update_encrypted_files_list()
+                self.decrypt_button.setEnabled(len(self.encrypted_files) > 0 and DECRYPTION_AVAILABLE)
+                self.show_info("文件查找结果", f"在所选容器中找到 {len(encrypted_files)} 个加密的PYC文件")
+            else:
+                self.show_info("文件查找结果", "在所选容器中未找到加密的PYC文件")
+                self.decrypt_button.setEnabled(False)
+    
     def clear_batch_files(self):
         self.batch_files.clear()
         self.update_batch_files_list()
@@ -2382,6 +2439,12 @@ class PythonDecompilerApp(QMainWindow):
                     result_msg += f"\n\n输出目录: {normalize_path_for_display(extract_base_dir)}"
                 self.show_info("批量反编译完成", result_msg)
     
+    def stop_decrypt(self):
+        if self.decrypt_engine is not None:
+            self.decrypt_engine.cancel()
+        self.decrypt_progress_label.setText("正在终止...")
+        self.decrypt_stop_button.setEnabled(False)
+    
     def decrypt_pyc_files(self):
         if not self.encrypted_files:
             self.show_error("没有文件", "请先选择要解密的PYC文件。")
@@ -2394,11 +2457,9 @@ class PythonDecompilerApp(QMainWindow):
         
         key_bytes = key.encode('utf-8')
         python_version = self.python_version_combo.currentText()
-        use_lt4 = self.pyinstaller_lt4_radio.isChecked()
+        scheme = 'cfb' if self.pyinstaller_lt4_radio.isChecked() else 'ctr'
         
         total_files = len(self.encrypted_files)
-        success_count = 0
-        failed_files = []
         
         self.decrypt_progress_bar.setValue(0)
         self.decrypt_progress_label.setText("正在解密...")
@@ -2410,79 +2471,44 @@ class PythonDecompilerApp(QMainWindow):
             extract_base_dir = os.path.join(os.path.dirname(self.encrypted_files[0]), "extract_de")
         
         try:
-            if use_lt4:
-                from Decryptor.decrypt_pyinstaller_lt4 import MAGIC_HEADERS
-                from Crypto.Cipher import AES
-                CRYPT_BLOCK_SIZE = 16
-            else:
-                import tinyaes
-                from Decryptor.decrypt_pyinstaller_ge4 import MAGIC_HEADERS
-                CRYPT_BLOCK_SIZE = 16
-        except ImportError as e:
-            error_msg = "解密 PyInstaller < 4.0 文件需要 pycryptodome 库。" if use_lt4 else "解密 PyInstaller >= 4.0 文件需要 tinyaes 库。"
-            self.show_error("依赖缺失", error_msg)
+            # 按方案选用本机最快的AES实现
+            cipher = SchemeCipher(scheme)
+        except RuntimeError as e:
+            self.show_error("依赖缺失", str(e))
             self.decrypt_progress_label.setText("解密中止")
             return
         
-        def process_single_file(encrypted_file):
-            try:
-                if not os.path.exists(encrypted_file):
-                    return False, "文件不存在"
-                
-                if hasattr(self, 'encrypted_base_dir'):
-                    rel_path = os.path.relpath(os.path.dirname(encrypted_file), self.encrypted_base_dir)
-                    if rel_path == '.':
-                        rel_path = ''
-                    output_dir = os.path.join(extract_base_dir, rel_path)
-                else:
-                    output_dir = extract_base_dir
-                
-                if not os.path.exists(output_dir):
-                    os.makedirs(output_dir)
-                
-                base_name = os.path.basename(encrypted_file)
-                if base_name.endswith('.pyc.encrypted'):
-                    output_name = base_name[:-10]
-                else:
-                    output_name = base_name + ".decrypted"
-                
-                output_path = os.path.join(output_dir, output_name)
-                
-                with open(encrypted_file, 'rb') as inf, open(output_path, 'wb') as outf:
-                    iv = inf.read(CRYPT_BLOCK_SIZE)
-                    
-                    if use_lt4:
-                        cipher = AES.new(key_bytes, AES.MODE_CFB, iv)
-                        plaintext = zlib.decompress(cipher.decrypt(inf.read()))
-                    else:
-                        cipher = tinyaes.AES(key_bytes, iv)
-                        plaintext = zlib.decompress(cipher.CTR_xcrypt_buffer(inf.read()))
-                    
-                    magic_header = MAGIC_HEADERS[python_version]
-                    outf.write(magic_header)
-                    
-                    outf.write(plaintext)
-                
-                return True, None
-                
-            except Exception as e:
-                return False, str(e)
-        
-        for i, encrypted_file in enumerate(self.encrypted_files):
-            self.decrypt_progress_label.setText(f"正在解密 ({i+1}/{total_files}): {normalize_path_for_display(os.path.basename(encrypted_file))}")
-            QApplication.processEvents()
-            
-            success, error = process_single_file(encrypted_file)
-            
-            if success:
-                success_count += 1
+        def output_path(encrypted_file):
+            if hasattr(self, 'encrypted_base_dir'):
+                rel_path = os.path.relpath(os.path.dirname(encrypted_file), self.encrypted_base_dir)
+                if rel_path == '.':
+                    rel_path = ''
+                output_dir = os.path.join(extract_base_dir, rel_path)
             else:
-                failed_files.append((encrypted_file, error))
-            
-            progress = int((i + 1) / total_files * 100)
-            self.decrypt_progress_bar.setValue(progress)
+                output_dir = extract_base_dir
+            return output_path_for(encrypted_file, output_dir)
+        
+        def update_progress(result, done, total):
+            self.decrypt_progress_label.setText(f"正在解密 ({done}/{total}): {normalize_path_for_display(os.path.basename(result.source))}")
+            self.decrypt_progress_bar.setValue(int(done / total * 100))
             QApplication.processEvents()
         
+        # 解密与解压在线程池中并行执行，进度回调在主线程中调用
+        self.decrypt_engine = DecryptionEngine(cipher, key_bytes, MAGIC_HEADERS[python_version])
+        self.decrypt_button.setEnabled(False)
+        self.decrypt_stop_button.setEnabled(True)
+        try:
+            jobs = [(encrypted_file, output_path(encrypted_file)) for encrypted_file in self.encrypted_files]
+            success_count, failed_files = self.decrypt_engine.run(jobs, update_progress)
+        finally:
+            self.decrypt_button.setEnabled(True)
+            self.decrypt_stop_button.setEnabled(False)
+        
+        if self.decrypt_engine.cancelled:
+            self.decrypt_progress_label.setText("已终止")
+            self.show_info("解密终止", f"已处理 {success_count + len(failed_files)}/{total_files} 个文件后终止，成功: {success_count}, 失败: {len(failed_files)}")
+            return
+        
         self.decrypt_progress_label.setText("解密完成")
         
         if failed_files:
@@ -3379,20 +3405,20 @@ class PythonDecompilerApp(QMainWindow):
         
         if message.startswith('[+]'):
             self.pyinstaller_progress_label.setText(message.strip())
-            
-            if "Extracting files:" in message or "Extracting PYZ contents:" in message:
-                try:
-                    progress_str = message.split('(')[-1].split('%')[0]
-                    progress = int(progress_str)
-                    self.pyinstaller_progress_bar.setValue(progress)
-                except:
-                    pass
         
         scrollbar = self.pyinstaller_results_text.verticalScrollBar()
         scrollbar.setValue(scrollbar.maximum())
         
         QApplication.processEvents()
     
+    def update_pyinstaller_progress(self, event):
+        if event.total:
+            self.pyinstaller_progress_bar.setValue(int(event.done / event.total * 100))
+        if event.stage != 'complete':
+            self.pyinstaller_progress_label.setText(describe_progress(event))
+        
+        QApplication.processEvents()
+    
     def extract_pyinstaller(self):
         if not PYINSTALLER_EXTRACTOR_AVAILABLE:
             self.show_error("模块未找到", "PyInstExtractor模块未找到，无法使用解包功能。")
@@ -3412,12 +3438,13 @@ class PythonDecompilerApp(QMainWindow):
         try:
             archive = PyInstArchive(exe_path)
             archive.set_status_callback(self.update_pyinstaller_status)
+            archive.subscribe(self.update_pyinstaller_progress)
             
             if archive.open():
                 if archive.checkFile():
                     if archive.getCArchiveInfo():
                         archive.parseTOC()
-                        extraction_dir = archive.extractFiles()
+                        extraction_dir = archive.extractFiles(workers=os.cpu_count() or 1)
                         archive.close()
                         
                         self.update_pyinstaller_status(f"\n[+] 解包成功！文件保存在: {normalize_path_for_display(extraction_dir)}")
@@ -3534,6 +3561,36 @@ class PythonDecompilerApp(QMainWindow):
         
         about_dialog.exec()
 
+    def search_decrypt_key(self, directory):
+        """密钥模块被删除时，在解包目录(及同名可执行文件)的全部可打印串中多进程搜索密钥，返回(密钥bytes, 方案名)"""
+        paths = [directory]
+        if directory.endswith('_extracted') and os.path.isfile(directory[:-len('_extracted')]):
+            paths.append(directory[:-len('_extracted')])
+
+        reply = QMessageBox.question(
+            self,
+            "搜索密钥",
+            "未能从密钥模块中找到可用的密钥，是否在以下文件中暴力搜索？\n\n" +
+            "\n".join(normalize_path_for_display(path) for path in paths) +
+            "\n\n搜索会占用全部CPU核心，文件较大时可能需要数分钟",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No
+        )
+        if reply == QMessageBox.StandardButton.No:
+            return None, None
+
+        def update_progress(stage, done, total):
+            if stage == 'scan':
+                self.decrypt_progress_label.setText(f"正在提取候选密钥... {done}/{total}")
+                self.decrypt_progress_bar.setValue(60 + 10 * done // total)
+            else:
+                self.decrypt_progress_label.setText(f"正在试解密候选密钥... {done}/{total}")
+                self.decrypt_progress_bar.setValue(70 + 20 * done // total)
+            QApplication.processEvents()
+
+        hits = search_keys(paths, get_files_with_extension(directory, ['.encrypted']), callback=update_progress)
+        return hits[0] if hits else (None, None)
+
     def auto_detect_decrypt_settings(self):
         directory = QFileDialog.getExistingDirectory(self, "选择PyInstaller解包后的文件夹")
         if not directory:
@@ -3543,104 +3600,48 @@ class PythonDecompilerApp(QMainWindow):
         self.decrypt_progress_bar.setValue(10)
         QApplication.processEvents()
         
-        crypto_key_files = []
-        archive_files = []
         magic_number = None
         
         for root, _, files in os.walk(directory):
             for filename in files:
                 if filename.endswith('.pyc'):
-                    full_path = os.path.join(root, filename)
-                    
                     try:
-                        with open(full_path, 'rb') as f:
+                        with open(os.path.join(root, filename), 'rb') as f:
                             file_header = f.read(4)
-                            if file_header in MAGIC_NUMBERS and magic_number is None:
-                                magic_number = file_header
-                            
-                            f.seek(0)
-                            content = f.read().decode('latin-1', errors='ignore').lower()
-                            
-                            if 'crypto_key' in content and full_path not in crypto_key_files:
-                                crypto_key_files.append(full_path)
-                            
-                            if 'archive' in content and 'pyinstaller' in content and full_path not in archive_files:
-                                archive_files.append(full_path)
-                    except:
+                    except OSError:
                         continue
+                    if file_header in MAGIC_NUMBERS:
+                        magic_number = file_header
+                        break
+            if magic_number is not None:
+                break
         
         self.decrypt_progress_bar.setValue(30)
         self.decrypt_progress_label.setText("正在分析文件...")
         QApplication.processEvents()
         
-        key = None
-        for key_file in crypto_key_files:
-            try:
-                decompiler = "uncompyle6"
-                result = self.run_decompiler(key_file, decompiler)
-                
-                if result:
-                    lines = result.splitlines()
-                    key_found = False
-                    
-                    for i, line in enumerate(lines):
-                        if 'crypto_key' in line.lower():
-                            for j in range(i, min(i+5, len(lines))):
-                                if '=' in lines[j]:
-                                    possible_key = lines[j].split('=')[1].strip()
-                                    possible_key = possible_key.strip("'\" ")
-                                    if possible_key and not possible_key.startswith(('(', '{')):
-                                        key = possible_key
-                                        key_found = True
-                                        break
-                            if key_found:
-                                break
-                    
-                    if not key_found:
-                        result_text = '\n'.join(lines)
-                        key_patterns = [
-                            r"crypto_key\s*=\s*['\"]([^'\"]+)['\"]",
-                            r"key\s*=\s*['\"]([^'\"]+)['\"]",
-                            r"key\s*=\s*b['\"]([^'\"]+)['\"]"
-                        ]
-                        
-                        for pattern in key_patterns:
-                            matches = re.findall(pattern, result_text)
-                            if matches:
-                                key = matches[0]
-                                key_found = True
-                                break
-            except:
-                continue
-            
-            if key:
-                break
+        # 直接读取pyimod00_crypto_key及引导模块的字符串常量，不需要反编译
+        candidate_keys = [key.decode('latin-1') for key in find_key_candidates(directory)] if DECRYPTION_AVAILABLE else []
         
         self.decrypt_progress_bar.setValue(60)
+        self.decrypt_progress_label.setText("正在试解密...")
         QApplication.processEvents()
         
-        is_lt4 = True
-        for arch_file in archive_files:
-            try:
-                result = self.run_decompiler(arch_file, decompiler)
-                
-                if result:
-                    result_lower = result.lower()
-                    
-                    ctr_patterns = ['mode_ctr', 'aes.ctr', '.ctrmode', 'tinyaes']
-                    cfb_patterns = ['mode_cfb', 'aes.cfb', '.cfbmode', 'pycrypto']
-                    
-                    has_ctr = any(pattern in result_lower for pattern in ctr_patterns)
-                    has_cfb = any(pattern in result_lower for pattern in cfb_patterns)
-                    
-                    if has_ctr:
-                        is_lt4 = False
-                        break
-                    elif has_cfb:
-                        is_lt4 = True
-                        break
-            except:
-                continue
+        # 用候选密钥和各加密方案试解密几个加密文件的前两个AES块，明文以合法zlib头开头即为正确组合
+        probes = read_probes(get_files_with_extension(directory, ['.encrypted'])) if DECRYPTION_AVAILABLE else []
+        key, scheme = None, None
+        if probes:
+            key_bytes, scheme = detect_settings(candidate_keys, probes)
+            if key_bytes is None:
+                key_bytes, scheme = self.search_decrypt_key(directory)
+            if key_bytes is not None:
+                key = key_bytes.decode('latin-1')
+        elif candidate_keys:
+            key = candidate_keys[0]
+        
+        version_number = detect_python_version(directory) if DECRYPTION_AVAILABLE else None
+        if version_number is None and magic_number in MAGIC_NUMBERS:
+            version_number = MAGIC_NUMBERS[magic_number].replace("Python ", "")
         
         self.decrypt_progress_bar.setValue(90)
         QApplication.processEvents()
@@ -3648,9 +3649,7 @@ class PythonDecompilerApp(QMainWindow):
         if key:
             self.decrypt_key_input.setText(key)
         
-        if magic_number and magic_number in MAGIC_NUMBERS:
-            python_version = MAGIC_NUMBERS[magic_number]
-            version_number = python_version.replace("Python ", "")
+        if version_number:
             found = False
             for i in range(self.python_version_combo.count()):
                 if self.python_version_combo.itemText(i) == version_number:
@@ -3659,17 +3658,17 @@ class PythonDecompilerApp(QMainWindow):
                     break
             
             if not found and version_number.startswith("3."):
-                major, minor = version_number.split('.')
+                major, minor = version_number.split('.')[:2]
                 for i in range(self.python_version_combo.count()):
                     combo_version = self.python_version_combo.itemText(i)
                     if combo_version.startswith(f"{major}."):
                         self.python_version_combo.setCurrentIndex(i)
                         break
         
-        if is_lt4:
-            self.pyinstaller_lt4_radio.setChecked(True)
-        else:
+        if scheme == 'ctr':
             self.pyinstaller_ge4_radio.setChecked(True)
+        else:
+            self.pyinstaller_lt4_radio.setChecked(True)
         
         self.decrypt_progress_bar.setValue(100)
         self.decrypt_progress_label.setText("识别完成")
@@ -3678,23 +3677,28 @@ class PythonDecompilerApp(QMainWindow):
         results.append("自动识别解密设置结果:")
         results.append("-" * 30)
         
-        if key:
-            results.append(f"✓ 加密密钥: {key}")
+        if key and scheme:
+            results.append(f"✓ 加密密钥: {key} (已通过试解密验证)")
+        elif key:
+            results.append(f"✓ 加密密钥: {key} (未找到加密文件，未验证)")
+        elif candidate_keys:
+            results.append(f"✗ 找到 {len(set(candidate_keys))} 个候选密钥，但都无法解密加密文件")
         else:
             results.append("✗ 未找到加密密钥")
         
-        if magic_number and magic_number in MAGIC_NUMBERS:
-            python_version = MAGIC_NUMBERS[magic_number]
-            results.append(f"✓ Python版本: {python_version}")
+        if version_number:
+            results.append(f"✓ Python版本: Python {version_number}")
         else:
             results.append("✗ 未能识别Python版本")
         
-        if is_lt4:
+        if scheme == 'ctr':
+            results.append(f"✓ PyInstaller版本: >= 4.0 (使用CTR模式加密)")
+        elif scheme == 'cfb':
             results.append(f"✓ PyInstaller版本: < 4.0 (使用CFB模式加密)")
-            results.append("  解密将使用PyCrypto/PyCryptodome库")
         else:
-            results.append(f"✓ PyInstaller版本: >= 4.0 (使用CTR模式加密)")
-            results.append("  解密将使用TinyAES库")
+            results.append("✗ 未能通过试解密确定加密模式，默认使用CFB模式 (PyInstaller < 4.0)")
+        if scheme:
+            results.append(f"  解密将使用{SchemeCipher(scheme).backend}库")
         
         results.append("-" * 30)
         results.append(f"扫描文件夹: {normalize_path_for_display(directory)}")
@@ -3706,7 +3710,7 @@ class PythonDecompilerApp(QMainWindow):
             
         QMessageBox.information(self, "自动识别结果", "\n".join(results))
         
-        if key and magic_number in MAGIC_NUMBERS:
+        if key and version_number:
             self.decrypt_button.setEnabled(True)
         
         if key:
@@ -0,0 +1,322 @@
+import io
+import os
+import time
+import sqlite3
+import tarfile
+import zipfile
+import tempfile
+import threading
+from contextlib import contextmanager
+
+
+# 支持的容器格式及其默认扩展名
+FORMATS = {
+    'zip': '.zip',
+    'tar': '.tar',
+    'sqlite': '.sqlite',
+}
+
+# 流式写入的大成员先落到临时文件，超过该大小才真正使用磁盘
+SPOOL_SIZE = 1024 * 1024
+
+# 大成员写入SQLite时每次复制的数据量；没有增量blob写入(Python < 3.11)时改为按较大的块追加，减少整行重写的次数
+BLOB_CHUNK_SIZE = 1024 * 1024
+APPEND_CHUNK_SIZE = 64 * 1024 * 1024
+
+
+def container_format(path):
+    """
+    判断容器文件的格式
+
+    文件已存在时按文件头识别，否则按扩展名推断，无法识别时返回None
+    """
+    if os.path.isfile(path):
+        with open(path, 'rb') as f:
+            head = f.read(16)
+        if head.startswith(b'PK'):
+            return 'zip'
+        if head.startswith(b'SQLite format 3\0'):
+            return 'sqlite'
+        if tarfile.is_tarfile(path):
+            return 'tar'
+        return None
+
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.db', '.sqlite3'):
+        return 'sqlite'
+    for fmt, fmtExt in FORMATS.items():
+        if ext == fmtExt:
+            return fmt
+    return None
+
+
+def open_container(path, mode='r', fmt=None):
+    """
+    打开解包容器
+
+    参数:
+        path: 容器文件路径
+        mode: 'r'读取，'w'新建(已存在的文件会被覆盖)
+        fmt: zip/tar/sqlite，为空时由container_format判断
+    """
+    fmt = fmt or container_format(path)
+    if fmt not in FORMATS:
+        raise ValueError('unknown container format for {0}'.format(path))
+    return _CONTAINERS[fmt](path, mode)
+
+
+def member_path(path, name):
+    """容器成员的路径形式：<容器文件>/<成员名>，可与普通文件路径一起放在文件列表中"""
+    return os.path.join(path, *name.split('/'))
+
+
+def split_member_path(path):
+    """
+    将member_path得到的路径拆分为(容器路径, 成员名)
+
+    路径本身存在(普通文件或目录)或不位于容器文件之下时返回None
+    """
+    path = os.fspath(path)
+    if os.path.exists(path):
+        return None
+
+    head, parts = path, []
+    while True:
+        head, tail = os.path.split(head)
+        if not tail:
+            return None
+        parts.insert(0, tail)
+        if os.path.isfile(head):
+            return (head, '/'.join(parts)) if container_format(head) else None
+
+
+def find_members(path, suffixes):
+    """容器中以suffixes结尾的全部成员，以member_path形式返回"""
+    with open_container(path) as c:
+        return [member_path(path, name) for name in c.names() if name.endswith(suffixes)]
+
+
+class Container:
+    """
+    单文件解包容器的公共接口
+
+    写入端由解包器使用，add/open可在多个线程中调用；读取端供反编译、解密等后续步骤直接读取成员，
+    成员名统一使用'/'分隔的相对路径
+    """
+
+    def __init__(self, path, mode='r'):
+        if mode not in ('r', 'w'):
+            raise ValueError('mode must be "r" or "w"')
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, name, *parts):
+        """写入一个成员，parts为若干bytes-like数据块，返回写入的字节数"""
+        with self.open(name) as f:
+            return sum(f.write(part) for part in parts)
+
+    def open(self, name):
+        """以上下文管理器形式返回成员的可写文件对象，用于分块写入的大成员"""
+        raise NotImplementedError
+
+    def names(self):
+        """全部成员名，按写入顺序"""
+        raise NotImplementedError
+
+    def read(self, name):
+        """读取一个成员的完整内容"""
+        raise NotImplementedError
+
+    def __iter__(self):
+        """按写入顺序产出(成员名, 内容)"""
+        for name in self.names():
+            yield name, self.read(name)
+
+    def __contains__(self, name):
+        return name in self.names()
+
+    def close(self):
+        raise NotImplementedError
+
+
+class ZipContainer(Container):
+    """不压缩的zip容器，成员可被任何zip工具直接访问"""
+
+    def __init__(self, path, mode='r'):
+        super().__init__(path, mode)
+        self._zip = zipfile.ZipFile(path, mode, zipfile.ZIP_STORED, allowZip64=True)
+
+    @contextmanager
+    def open(self, name):
+        # zipfile同一时刻只允许一个写入句柄，锁需覆盖整个写入过程
+        with self._lock:
+            info = zipfile.ZipInfo(name, time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_STORED
+            with self._zip.open(info, 'w', force_zip64=True) as f:
+                yield f
+
+    def names(self):
+        return self._zip.namelist()
+
+    def read(self, name):
+        return self._zip.read(name)
+
+    def close(self):
+        self._zip.close()
+
+
+class TarContainer(Container):
+    """不压缩的tar容器"""
+
+    def __init__(self, path, mode='r'):
+        super().__init__(path, mode)
+        self._tar = tarfile.open(path, mode, format=tarfile.PAX_FORMAT)
+        self._members = None
+
+    def add(self, name, *parts):
+        # tar头部需要预先知道大小，小成员直接拼接后写入
+        data = b''.join(parts)
+        with self._lock:
+            self._tar.addfile(self._tarInfo(name, len(data)), io.BytesIO(data))
+        return len(data)
+
+    @contextmanager
+    def open(self, name):
+        with tempfile.SpooledTemporaryFile(SPOOL_SIZE) as f:
+            yield f
+            size = f.tell()
+            f.seek(0)
+            with self._lock:
+                self._tar.addfile(self._tarInfo(name, size), f)
+
+    @staticmethod
+    def _tarInfo(name, size):
+        info = tarfile.TarInfo(name)
+        info.size = size
+        info.mtime = int(time.time())
+        return info
+
+    def _index(self):
+        if self._members is None:
+            self._members = {member.name: member for member in self._tar.getmembers() if member.isfile()}
+        return self._members
+
+    def names(self):
+        return list(self._index())
+
+    def read(self, name):
+        with self._lock:
+            f = self._tar.extractfile(self._index()[name])
+            return f.read()
+
+    def close(self):
+        self._tar.close()
+
+
+class SqliteContainer(Container):
+    """SQLite容器，成员保存在members表(name, data)中，适合按名称随机访问"""
+
+    def __init__(self, path, mode='r'):
+        super().__init__(path, mode)
+        if mode == 'w' and os.path.exists(path):
+            os.remove(path)
+        if mode == 'r':
+            self._db = sqlite3.connect('file:{0}?mode=ro'.format(path), uri=True, check_same_thread=False)
+        else:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=OFF')
+            self._db.execute('PRAGMA synchronous=OFF')
+            self._db.execute('CREATE TABLE members (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL, data BLOB NOT NULL)')
+
+    def add(self, name, *parts):
+        data = b''.join(parts)
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO members (name, data) VALUES (?, ?)', (name, data))
+        return len(data)
+
+    @contextmanager
+    def open(self, name):
+        # 成员数据分块写入，内存占用与成员大小无关
+        with tempfile.SpooledTemporaryFile(SPOOL_SIZE) as f:
+            yield f
+            size = f.seek(0, os.SEEK_END)
+            f.seek(0)
+            with self._lock:
+                if hasattr(self._db, 'blobopen'):
+                    rowid = self._db.execute('INSERT OR REPLACE INTO members (name, data) VALUES (?, zeroblob(?))', (name, size)).lastrowid
+                    with self._db.blobopen('members', 'data', rowid) as blob:
+                        for chunk in iter(lambda: f.read(BLOB_CHUNK_SIZE), b''):
+                            blob.write(chunk)
+                else:
+                    self._db.execute('INSERT OR REPLACE INTO members (name, data) VALUES (?, ?)', (name, f.read(APPEND_CHUNK_SIZE)))
+                    for chunk in iter(lambda: f.read(APPEND_CHUNK_SIZE), b''):
+                        self._db.execute('UPDATE members SET data = CAST(data || ? AS BLOB) WHERE name = ?', (chunk, name))
+
+    def names(self):
+        with self._lock:
+            return [row[0] for row in self._db.execute('SELECT name FROM members ORDER BY id')]
+
+    def read(self, name):
+        with self._lock:
+            row = self._db.execute('SELECT data FROM members WHERE name = ?', (name, )).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return row[0]
+
+    def __iter__(self):
+        # 逐行游标读取，不一次性加载全部成员
+        cursor = self._db.cursor()
+        cursor.execute('SELECT name, data FROM members ORDER BY id')
+        for name, data in cursor:
+            yield name, data
+
+    def close(self):
+        if self.mode == 'w':
+            self._db.commit()
+        self._db.close()
+
+
+_CONTAINERS = {
+    'zip': ZipContainer,
+    'tar': TarContainer,
+    'sqlite': SqliteContainer,
+}
+
+
+def _unpack_target(outDir, name):
+    """
+    成员在outDir下的输出路径，与解包器的原始数据条目一致地把'..'替换为'__'，并去掉开头的'/'与盘符
+
+    规范化后仍不在outDir之内的成员返回None
+    """
+    parts = [part.replace('..', '__') for part in name.replace('\\', '/').split('/') if part]
+    if parts:
+        parts[0] = os.path.splitdrive(parts[0])[1] or parts[0].replace(':', '_')
+    if not parts:
+        return None
+
+    root = os.path.abspath(outDir)
+    target = os.path.abspath(os.path.join(root, *parts))
+    if os.path.commonpath([root, target]) != root or target == root:
+        return None
+    return target
+
+
+def unpack_container(path, outDir):
+    """将容器中的全部成员还原为目录树，供仍需要松散文件的工具使用；会越出outDir的成员被跳过"""
+    with open_container(path) as container:
+        for name, data in container:
+            target = _unpack_target(outDir, name)
+            if target is None:
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'wb') as f:
+                f.write(data)
+    return outDir
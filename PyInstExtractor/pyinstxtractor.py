@@ -1,9 +1,48 @@
+import io
 import os
 import sys
+import mmap
 import struct
 import zlib
 import marshal
 import uuid
+import hashlib
+import glob
+import shutil
+import fnmatch
+import json
+import time
+import queue
+import tarfile
+import zipfile
+import tempfile
+import threading
+from collections import deque, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+try:
+    from PyInstExtractor import pymarshal, container
+    from PyInstExtractor.pyzcrypt import CRYPT_BLOCK_SIZE, KEY_MODULE, looks_like_zlib, pad_key, iter_module_keys
+except ImportError:
+    import pymarshal
+    import container
+    from pyzcrypt import CRYPT_BLOCK_SIZE, KEY_MODULE, looks_like_zlib, pad_key, iter_module_keys
+
+try:
+    from Crypto.Cipher import AES
+except ImportError:
+    AES = None
+
+try:
+    import tinyaes
+except ImportError:
+    tinyaes = None
+
+# 作为PyGlimmer的一部分导入时使用Decryptor中登记的加密方案与AES实现，单独运行时只支持内置的ctr与cfb
+try:
+    from Decryptor.schemes import SCHEMES, SchemeCipher
+except ImportError:
+    SCHEMES, SchemeCipher = None, None
 
 
 def normalize_path_for_display(path):
@@ -11,6 +50,220 @@ def normalize_path_for_display(path):
     return path.replace('\\', '/')
 
 
+def scheme_names():
+    """提取时依次尝试的加密方案名：Decryptor可用时为其注册表中的全部方案，否则为内置的ctr与cfb"""
+    return list(SCHEMES) if SCHEMES is not None else ['ctr', 'cfb']
+
+
+def decrypt_pyz_member(data, key, mode):
+    """
+    解密并解压PyInstaller加密的PYZ成员，数据的前16字节为IV
+
+    mode为Decryptor中登记的加密方案名，由其选择AES实现；Decryptor不可用时只支持
+    'ctr'(PyInstaller>=4.0，tinyaes，不可用时改用pycryptodome)与'cfb'(PyInstaller<4.0，pycryptodome)
+    """
+    iv = bytes(data[:CRYPT_BLOCK_SIZE])
+    ciphertext = bytes(data[CRYPT_BLOCK_SIZE:])
+
+    if SchemeCipher is not None:
+        return zlib.decompress(SchemeCipher(mode)(key, iv, ciphertext))
+
+    if mode == 'ctr':
+        if tinyaes is not None:
+            plaintext = tinyaes.AES(key, iv).CTR_xcrypt_buffer(ciphertext)
+        elif AES is not None:
+            plaintext = AES.new(key, AES.MODE_CTR, nonce=b'', initial_value=iv).decrypt(ciphertext)
+        else:
+            raise RuntimeError('AES-CTR decryption requires tinyaes or pycryptodome')
+    elif mode == 'cfb':
+        if AES is None:
+            raise RuntimeError('AES-CFB decryption requires pycryptodome')
+        plaintext = AES.new(key, AES.MODE_CFB, iv).decrypt(ciphertext)
+    else:
+        raise ValueError('unknown cipher mode: {0}'.format(mode))
+
+    return zlib.decompress(plaintext)
+
+
+class _SerialExecutor:
+    """与Executor接口一致的同步执行器，串行模式下直接在当前线程执行任务"""
+
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait=True):
+        pass
+
+
+class _BackgroundWriter:
+    """
+    后台写盘线程，与Executor接口一致
+
+    任务在单个线程中按提交顺序执行；队列有界，写盘跟不上时submit阻塞，
+    从而在解压(CPU)与写盘(I/O)重叠的同时限制在途数据占用的内存
+    """
+
+    def __init__(self, maxsize):
+        self._queue = queue.Queue(maxsize)
+        self._thread = threading.Thread(target=self._run, name='pyinstxtractor-writer', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            task = self._queue.get()
+            if task is None:
+                return
+            future, fn, args = task
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def submit(self, fn, *args):
+        future = Future()
+        self._queue.put((future, fn, args))
+        return future
+
+    def shutdown(self, wait=True):
+        self._queue.put(None)
+        if wait:
+            self._thread.join()
+
+
+# iterMembers产出的记录：kind为entry_point/module/pyz/data/pyz_module/pyz_package/encrypted，
+# pyc_header为字节码成员对应的pyc头，非字节码成员为None
+ArchiveMember = namedtuple('ArchiveMember', 'name kind raw_bytes pyc_header')
+
+
+# 提取进度事件：stage为carchive/pyz/zip/tar/verify/complete，done/total为当前阶段已完成与总的条目数，
+# bytes为已写入的字节数，entry为当前条目名，warnings为累计的警告与错误数
+ProgressEvent = namedtuple('ProgressEvent', 'stage done total bytes entry warnings')
+
+
+_PROGRESS_LABELS = {
+    'carchive': 'Extracting files',
+    'pyz': 'Extracting PYZ contents',
+    'zip': 'Extracting zip contents',
+    'tar': 'Extracting tar contents',
+    'verify': 'Verifying entries',
+    'complete': 'Extraction complete',
+}
+
+
+def describe_progress(event):
+    """将进度事件格式化为单行文本，供命令行与日志输出"""
+    label = _PROGRESS_LABELS.get(event.stage, event.stage)
+    percent = int(event.done / event.total * 100) if event.total else 100
+    return f"[+] {label}: {event.done}/{event.total} ({percent}%)"
+
+
+# 续传时判定为无需重新提取的条目，由解压任务返回
+_UNCHANGED = object()
+
+
+class _ExtractionManifest:
+    """
+    增量/续传提取使用的清单，以JSON Lines日志形式保存在解包目录旁
+
+    首行记录源文件标识(大小、修改时间、sha256)，其后每行记录一个已写盘的条目：
+    条目在源文件中的位置、压缩大小、压缩数据CRC32以及写出的文件及其大小。
+    提取过程中逐条追加，即使中断也能反映已写入的内容；提取完成后压缩重写
+    """
+
+    VERSION = 1
+
+    def __init__(self, path, fData, filePath):
+        self.path = path
+        self.previous = {}
+        self.current = {}
+        lastSource = None
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get('manifest') == self.VERSION:
+                        lastSource = record['source']
+                    elif record.get('version') == self.VERSION:
+                        self.previous[record['key']] = record
+        except OSError:
+            pass
+
+        # 内存中的样本没有修改时间可比较，总是重新计算sha256
+        if filePath is not None:
+            st = os.stat(filePath)
+            self.source = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+        else:
+            self.source = {'size': len(fData), 'mtime_ns': None}
+        if filePath is not None and lastSource and all(lastSource.get(k) == v for k, v in self.source.items()):
+            self.source['sha256'] = lastSource['sha256']
+        else:
+            self.source['sha256'] = hashlib.sha256(fData).hexdigest()
+
+        self.journal = open(path, 'a', encoding='utf-8', buffering=1)
+        self.journal.write(json.dumps({'manifest': self.VERSION, 'source': self.source}) + '\n')
+
+    def lookup(self, key, position, size, payload, outDir):
+        """若条目自上次提取以来未变且输出文件完好，返回上次的记录，否则返回None"""
+        record = self.previous.get(key)
+        if record is None or record['position'] != position or record['size'] != size:
+            return None
+
+        # 同一源文件直接信任记录，否则比较压缩数据的CRC32
+        if record['source'] != self.source['sha256'] and record['crc32'] != zlib.crc32(payload):
+            return None
+
+        for name, outSize in record['outputs'].items():
+            try:
+                if os.path.getsize(os.path.join(outDir, name)) != outSize:
+                    return None
+            except OSError:
+                return None
+        return record
+
+    def add(self, key, position, size, payload, outputs, outDir, **extra):
+        """记录一个刚写盘的条目，outputs为相对解包目录的输出文件列表"""
+        record = {
+            'version': self.VERSION,
+            'key': key,
+            'source': self.source['sha256'],
+            'position': position,
+            'size': size,
+            'crc32': zlib.crc32(payload),
+            'outputs': {name: os.path.getsize(os.path.join(outDir, name)) for name in outputs},
+        }
+        record.update(extra)
+        self.keep(record)
+
+    def keep(self, record):
+        """将记录写入本次的清单"""
+        self.current[record['key']] = record
+        self.journal.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def close(self, compact=True):
+        """关闭日志；compact为True时仅保留本次提取涉及的记录并原子替换清单文件"""
+        self.journal.close()
+        if not compact:
+            return
+
+        tmpPath = self.path + '.tmp'
+        with open(tmpPath, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'manifest': self.VERSION, 'source': self.source}) + '\n')
+            for record in self.current.values():
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        os.replace(tmpPath, self.path)
+
+
 class CTOCEntry:
     """目录条目类，用于存储PyInstaller归档中的文件信息"""
     
@@ -29,37 +282,251 @@ class PyInstArchive:
     PYINST20_COOKIE_SIZE = 24
     PYINST21_COOKIE_SIZE = 24 + 64
     MAGIC = b'MEI\014\013\012\013\016'
-
-    def __init__(self, path):
-        self.filePath = path
+    # 压缩前或解压后超过该阈值的数据条目改为分块流式解压，避免整体驻留内存
+    STREAM_THRESHOLD = 64 * 1024 * 1024
+    STREAM_CHUNK_SIZE = 1024 * 1024
+    MANIFEST_SUFFIX = '.manifest.jsonl'
+    INDEX_SUFFIX = '.index.jsonl'
+    # 递归提取嵌套归档的最大深度
+    MAX_NESTING = 8
+    # 进度事件的最小间隔(秒)，即最多10Hz
+    PROGRESS_INTERVAL = 0.1
+
+    def __init__(self, path, name=None):
+        """
+        path为PyInstaller程序的文件路径，也可以是bytes-like对象(bytes、bytearray、memoryview、mmap)
+        或可seek的二进制流，此时无需先写入临时文件；name用于状态信息与解包目录命名，
+        未指定时为数据sha256的前16位
+        """
+        if isinstance(path, (str, os.PathLike)):
+            self.filePath = os.fspath(path)
+            self._buffer = None
+        else:
+            self.filePath = name
+            self._buffer = path
+        self.fPtr = None
+        self._ownsMap = True
         self.pycMagic = b'\0' * 4
         self.barePycList = []
         self.extractionDir = ""
         self.status_callback = None
+        self.bytesWritten = 0
+        self.pyzEntryCount = 0
+        self._statsLock = threading.Lock()
+        self.streamThreshold = self.STREAM_THRESHOLD
+        self.manifest = None
+        self._unchanged = {}
+        self.storeDir = None
+        self.dedupFiles = 0
+        self.dedupBytes = 0
+        self._createdDirs = set()
+        self.containerFormat = None
+        self.containerPath = None
+        self.container = None
+        self.rootDir = ""
+        self.depth = 0
+        self.index = None
+        self._nested = None
+        self.warnings = 0
+        self._listeners = []
+        self._progressKey = None
+        self._lastProgress = 0.0
+        self.decryptPyz = True
+        self.cryptoKey = None
+        self.cryptoMode = None
+        self._cryptoSettings = (None, None)
+        self._cryptoResolved = False
+        self.set_filters()
 
     def set_status_callback(self, callback):
         """设置状态回调函数"""
         self.status_callback = callback
 
+    def set_filters(self, include=None, exclude=None, types=None, pyzInclude=None, pyzExclude=None):
+        """
+        设置选择性提取的过滤条件，未设置的条件不做限制
+
+        参数:
+            include/exclude: CArchive条目名的通配符列表，如['*.pyd', 'lib/*']
+            types: 需要提取的条目类型(typeCmprsData)，如'sMmz'仅提取字节码与PYZ
+            pyzInclude/pyzExclude: PYZ模块名的通配符列表，'pkg.*'同时匹配包本身及其全部子模块
+        """
+        if isinstance(types, (str, bytes)):
+            types = [types]
+
+        self.includePatterns = list(include or [])
+        self.excludePatterns = list(exclude or [])
+        self.typeFilter = None if types is None else {
+            bytes([c]) for t in types for c in (t.encode() if isinstance(t, str) else t)
+        }
+        self.pyzIncludePatterns = list(pyzInclude or [])
+        self.pyzExcludePatterns = list(pyzExclude or [])
+
+    def _wantEntry(self, entry):
+        """判断CArchive条目是否满足过滤条件"""
+        if self.typeFilter is not None and entry.typeCmprsData not in self.typeFilter:
+            return False
+        if self.includePatterns and not any(fnmatch.fnmatch(entry.name, pat) for pat in self.includePatterns):
+            return False
+        return not any(fnmatch.fnmatch(entry.name, pat) for pat in self.excludePatterns)
+
+    @staticmethod
+    def _matchModule(name, patterns):
+        """模块名匹配，'pkg.*'同时匹配包pkg本身"""
+        return any(fnmatch.fnmatchcase(name, pat) or (pat.endswith('.*') and fnmatch.fnmatchcase(name, pat[:-2]))
+                   for pat in patterns)
+
+    def _wantPyzMember(self, name):
+        """判断PYZ成员是否满足过滤条件"""
+        if self.pyzIncludePatterns and not self._matchModule(name, self.pyzIncludePatterns):
+            return False
+        return not self._matchModule(name, self.pyzExcludePatterns)
+
+    def set_decryption(self, key=None, mode=None, enabled=True):
+        """
+        设置PYZ加密成员的解密方式
+
+        默认启用：遇到无法解压的成员时，使用给定的key，或从归档内pyimod00_crypto_key中读取密钥，
+        在提取过程中直接解密、解压并写出pyc。mode为加密方案名(见scheme_names)，为空时根据归档模块与试解密自动判断；
+        enabled为False时保持原样输出.encrypted文件
+        """
+        if key is not None:
+            key = pad_key(key)
+        self.decryptPyz = enabled
+        self.cryptoKey = key
+        self.cryptoMode = mode
+        # 调用方给定的设置，嵌套归档以此为起点各自确定密钥与模式
+        self._cryptoSettings = (key, mode)
+        self._cryptoResolved = False
+
+    def set_content_store(self, storeDir):
+        """
+        设置内容寻址存储目录，为None时关闭
+
+        启用后每个输出文件按sha256存入storeDir，解包目录中的文件以硬链接指向存储对象，
+        多个样本中内容相同的文件(python3X.dll、标准库模块等)只写盘一次；
+        文件系统不支持硬链接时退化为复制
+        """
+        self.storeDir = storeDir
+        if storeDir and not os.path.exists(storeDir):
+            os.makedirs(storeDir, exist_ok=True)
+
+    def set_output_container(self, fmt, path=None):
+        """
+        将解包结果写入单个容器文件(不压缩的zip、tar或SQLite)而非解包目录，fmt为None时关闭
+
+        path默认为<程序名>_extracted.<扩展名>；容器成员名为解包目录下的相对路径(以'/'分隔)，
+        可用container.open_container直接读取。容器模式下不使用续传清单与内容寻址存储
+        """
+        if fmt is not None and fmt not in container.FORMATS:
+            raise ValueError('unsupported container format: {0}'.format(fmt))
+        self.containerFormat = fmt
+        self.containerPath = path
+
+    def subscribe(self, callback):
+        """
+        订阅提取进度事件，callback在提取线程中以ProgressEvent调用
+
+        事件按PROGRESS_INTERVAL合并，阶段切换、阶段完成与提取结束时总会发出
+        """
+        self._listeners.append(callback)
+
+    def _progress(self, stage, done, total, entry=None, force=False):
+        """发出进度事件，距上次不足PROGRESS_INTERVAL的中间进度直接丢弃"""
+        if not self._listeners:
+            return
+        now = time.monotonic()
+        key = (stage, total)
+        if not force and key == self._progressKey and done < total and now - self._lastProgress < self.PROGRESS_INTERVAL:
+            return
+
+        self._progressKey = key
+        self._lastProgress = now
+        event = ProgressEvent(stage, done, total, self.bytesWritten, entry, self.warnings)
+        for listener in self._listeners:
+            listener(event)
+
     def status(self, msg):
         """输出状态信息"""
+        if msg.startswith('[!]'):
+            self.warnings += 1
         if self.status_callback:
             self.status_callback(msg)
         else:
             print(msg)
 
     def open(self):
-        """打开PyInstaller文件"""
+        """打开PyInstaller文件，并将其整体映射到内存"""
+        if self._buffer is not None:
+            return self._openBuffer()
+
         try:
             self.fPtr = open(self.filePath, 'rb')
             self.fileSize = os.stat(self.filePath).st_size
         except:
             self.status('[!] Error: Could not open {0}'.format(self.filePath))
             return False
+
+        try:
+            self.fMap = mmap.mmap(self.fPtr.fileno(), 0, access=mmap.ACCESS_READ) if self.fileSize else b''
+        except (ValueError, OSError):
+            self.fMap = self.fPtr.read()
+        self.fData = memoryview(self.fMap)
+        return True
+
+    def _openBuffer(self):
+        """
+        打开内存中的样本：bytes-like对象直接零拷贝使用；二进制流有文件描述符时映射整个文件，
+        否则一次性读入内存。调用方传入的对象与流不会被本类关闭
+        """
+        source = self._buffer
+        self._ownsMap = False
+        try:
+            if isinstance(source, io.BytesIO):
+                self.fMap = source.getvalue()
+            elif hasattr(source, 'read') and not isinstance(source, mmap.mmap):
+                try:
+                    self.fMap = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+                    self._ownsMap = True
+                except (OSError, ValueError):
+                    source.seek(0)
+                    self.fMap = source.read()
+            else:
+                self.fMap = source
+
+            self.fData = memoryview(self.fMap)
+            if self.fData.ndim != 1 or self.fData.itemsize != 1:
+                self.fData = self.fData.cast('B')
+        except (OSError, ValueError, TypeError) as e:
+            self.status('[!] Error: Could not read in-memory sample {0}: {1}'.format(self.filePath or '', e))
+            return False
+
+        self.fileSize = len(self.fData)
+        if not self.filePath:
+            self.filePath = hashlib.sha256(self.fData).hexdigest()[:16]
         return True
 
+    def _rfind(self, sub, start=0, end=None):
+        """在样本中反向查找sub；memoryview输入没有rfind，只复制待查找的区间"""
+        end = self.fileSize if end is None else end
+        if hasattr(self.fMap, 'rfind'):
+            return self.fMap.rfind(sub, start, end)
+        pos = bytes(self.fData[start:end]).rfind(sub)
+        return pos if pos == -1 else start + pos
+
     def close(self):
-        """关闭文件句柄"""
+        """释放内存映射并关闭文件句柄"""
+        try:
+            self.fData.release()
+        except:
+            pass
+
+        try:
+            if self._ownsMap:
+                self.fMap.close()
+        except:
+            pass
+
         try:
             self.fPtr.close()
         except:
@@ -69,42 +536,18 @@ class PyInstArchive:
         """检查文件是否为有效的PyInstaller归档"""
         self.status('[+] Processing {0}'.format(self.filePath))
 
-        searchChunkSize = 8192
-        endPos = self.fileSize
-        self.cookiePos = -1
-
-        if endPos < len(self.MAGIC):
+        if self.fileSize < len(self.MAGIC):
             self.status('[!] Error : File is too short or truncated')
             return False
 
-        while True:
-            startPos = endPos - searchChunkSize if endPos >= searchChunkSize else 0
-            chunkSize = endPos - startPos
-
-            if chunkSize < len(self.MAGIC):
-                break
-
-            self.fPtr.seek(startPos, os.SEEK_SET)
-            data = self.fPtr.read(chunkSize)
-
-            offs = data.rfind(self.MAGIC)
-
-            if offs != -1:
-                self.cookiePos = startPos + offs
-                break
-
-            endPos = startPos + len(self.MAGIC) - 1
-
-            if startPos == 0:
-                break
+        self.cookiePos = self._findCookie()
 
         if self.cookiePos == -1:
             self.status('[!] Error : Missing cookie, unsupported pyinstaller version or not a pyinstaller archive')
             return False
 
-        self.fPtr.seek(self.cookiePos + self.PYINST20_COOKIE_SIZE, os.SEEK_SET)
-
-        if b'python' in self.fPtr.read(64).lower():
+        pylibPos = self.cookiePos + self.PYINST20_COOKIE_SIZE
+        if b'python' in bytes(self.fData[pylibPos:pylibPos + 64]).lower():
             self.status('[+] Pyinstaller version: 2.1+')
             self.pyinstVer = 21
         else:
@@ -113,18 +556,131 @@ class PyInstArchive:
 
         return True
 
+    def _findCookie(self):
+        """
+        定位cookie：先根据PE/ELF头部直接检查附加数据(overlay)或pydata节的末尾，
+        再在这些区间内查找；无法识别文件格式时才回退为全文件反向查找
+        """
+        regions = self._payloadRegions()
+        if regions is None:
+            return self._rfind(self.MAGIC)
+
+        pos = self._trailingCookie(regions)
+        if pos != -1:
+            return pos
+
+        for start, end in regions:
+            pos = self._rfind(self.MAGIC, start, end)
+            if pos != -1:
+                return pos
+
+        return -1
+
+    def _trailingCookie(self, regions):
+        """检查各区间末尾是否恰好是cookie，返回其偏移，未找到时返回-1"""
+        for start, end in regions:
+            for cookieSize in (self.PYINST21_COOKIE_SIZE, self.PYINST20_COOKIE_SIZE):
+                pos = end - cookieSize
+                if pos >= start and self.fData[pos:pos + len(self.MAGIC)] == self.MAGIC:
+                    return pos
+        return -1
+
+    def _payloadRegions(self):
+        """返回可能存放CArchive的区间列表[(start, end)]；不是可解析的PE/ELF文件时返回None"""
+        try:
+            if self.fData[0:2] == b'MZ':
+                return self._peRegions()
+            if self.fData[0:4] == b'\x7fELF':
+                return self._elfRegions()
+        except (struct.error, IndexError, ValueError):
+            pass
+        return None
+
+    def _peRegions(self):
+        """解析PE节表，附加数据从最后一个节的原始数据末尾开始，签名(证书表)之前结束"""
+        (peOffset, ) = struct.unpack_from('<I', self.fData, 0x3c)
+        if self.fData[peOffset:peOffset + 4] != b'PE\0\0':
+            return None
+
+        (numSections, ) = struct.unpack_from('<H', self.fData, peOffset + 6)
+        (optSize, ) = struct.unpack_from('<H', self.fData, peOffset + 20)
+        optPos = peOffset + 24
+        sectionPos = optPos + optSize
+        if numSections == 0 or sectionPos + numSections * 40 > self.fileSize:
+            return None
+
+        overlayPos = sectionPos + numSections * 40
+        for i in range(numSections):
+            (rawSize, rawPtr) = struct.unpack_from('<II', self.fData, sectionPos + i * 40 + 16)
+            if rawSize:
+                overlayPos = max(overlayPos, rawPtr + rawSize)
+
+        if overlayPos > self.fileSize:
+            return None
+
+        regions = []
+        (optMagic, ) = struct.unpack_from('<H', self.fData, optPos)
+        certDirPos = optPos + (112 if optMagic == 0x20b else 96) + 4 * 8
+        if certDirPos + 8 <= sectionPos:
+            (certPos, certSize) = struct.unpack_from('<II', self.fData, certDirPos)
+            if certSize and overlayPos <= certPos and certPos + certSize <= self.fileSize:
+                regions.append((overlayPos, certPos))
+
+        regions.append((overlayPos, self.fileSize))
+        return regions
+
+    def _elfRegions(self):
+        """解析ELF节表，优先检查PyInstaller写入的pydata节，其次是节表之后的附加数据"""
+        is64 = self.fData[4] == 2
+        endian = '<' if self.fData[5] == 1 else '>'
+
+        if is64:
+            (shOffset, ) = struct.unpack_from(endian + 'Q', self.fData, 0x28)
+            (shEntSize, shNum, shStrIndex) = struct.unpack_from(endian + 'HHH', self.fData, 0x3a)
+            shFormat, shFields = endian + 'II8xQQQ', (0, 1, 3, 4)
+        else:
+            (shOffset, ) = struct.unpack_from(endian + 'I', self.fData, 0x20)
+            (shEntSize, shNum, shStrIndex) = struct.unpack_from(endian + 'HHH', self.fData, 0x2e)
+            shFormat, shFields = endian + 'II4xIII', (0, 1, 3, 4)
+
+        if shNum == 0 or shOffset + shNum * shEntSize > self.fileSize or shStrIndex >= shNum:
+            return None
+
+        sections = []
+        for i in range(shNum):
+            fields = struct.unpack_from(shFormat, self.fData, shOffset + i * shEntSize)
+            sections.append(tuple(fields[j] for j in shFields))
+
+        (_, _, strOffset, strSize) = sections[shStrIndex]
+        names = self.fData[strOffset:strOffset + strSize]
+
+        regions = []
+        overlayPos = shOffset + shNum * shEntSize
+        for (nameOffset, sectionType, offset, size) in sections:
+            # SHT_NOBITS(.bss)不占文件空间
+            if sectionType == 8:
+                continue
+            overlayPos = max(overlayPos, offset + size)
+            nameEnd = bytes(names[nameOffset:nameOffset + 8]).split(b'\0', 1)[0]
+            if nameEnd == b'pydata' and offset + size <= self.fileSize:
+                regions.append((offset, offset + size))
+
+        if overlayPos > self.fileSize:
+            return None
+
+        regions.append((overlayPos, self.fileSize))
+        return regions
+
     def getCArchiveInfo(self):
         """获取CArchive信息"""
         try:
             if self.pyinstVer == 20:
-                self.fPtr.seek(self.cookiePos, os.SEEK_SET)
                 (magic, lengthofPackage, toc, tocLen, pyver) = \
-                struct.unpack('!8siiii', self.fPtr.read(self.PYINST20_COOKIE_SIZE))
+                struct.unpack_from('!8siiii', self.fData, self.cookiePos)
 
             elif self.pyinstVer == 21:
-                self.fPtr.seek(self.cookiePos, os.SEEK_SET)
                 (magic, lengthofPackage, toc, tocLen, pyver, pylibname) = \
-                struct.unpack('!8sIIii64s', self.fPtr.read(self.PYINST21_COOKIE_SIZE))
+                struct.unpack_from('!8sIIii64s', self.fData, self.cookiePos)
 
         except:
             self.status('[!] Error : The file is not a pyinstaller archive')
@@ -144,19 +700,18 @@ class PyInstArchive:
 
     def parseTOC(self):
         """解析目录表"""
-        self.fPtr.seek(self.tableOfContentsPos, os.SEEK_SET)
-
         self.tocList = []
         parsedLen = 0
+        nameLen = struct.calcsize('!iIIIBc')
 
         while parsedLen < self.tableOfContentsSize:
-            (entrySize, ) = struct.unpack('!i', self.fPtr.read(4))
-            nameLen = struct.calcsize('!iIIIBc')
+            entryOffset = self.tableOfContentsPos + parsedLen
+            (entrySize, ) = struct.unpack_from('!i', self.fData, entryOffset)
 
             (entryPos, cmprsdDataSize, uncmprsdDataSize, cmprsFlag, typeCmprsData, name) = \
-            struct.unpack( \
+            struct.unpack_from( \
                 '!IIIBc{0}s'.format(entrySize - nameLen), \
-                self.fPtr.read(entrySize - 4))
+                self.fData, entryOffset + 4)
 
             try:
                 name = name.decode("utf-8").rstrip("\0")
@@ -185,208 +740,1260 @@ class PyInstArchive:
             parsedLen += entrySize
         self.status('[+] Found {0} files in CArchive'.format(len(self.tocList)))
 
+    def _outPath(self, path):
+        """将归档内的相对路径解析到本次解包的输出目录下，不依赖进程当前工作目录"""
+        return os.path.join(self.extractionDir, path)
+
+    def _addWritten(self, size):
+        """累计写入磁盘的字节数，写入可能发生在多个工作线程中"""
+        with self._statsLock:
+            self.bytesWritten += size
+
+    def _containerName(self, path):
+        """输出路径在容器中的成员名，即相对于最外层解包目录、以'/'分隔的路径"""
+        return os.path.relpath(path, self.rootDir or self.extractionDir).replace(os.sep, '/')
+
+    def _openOutput(self, path):
+        """以可写文件对象打开输出路径，容器模式下打开对应的容器成员"""
+        if self.container:
+            return self.container.open(self._containerName(path))
+        return self._openFresh(path)
+
+    @staticmethod
+    def _openFresh(path):
+        """
+        先删除已有的输出再新建文件
+
+        之前启用内容寻址存储时，输出是指向存储对象的硬链接，原地截断会改写共享的存储对象
+        """
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        return open(path, 'wb')
+
+    def _writeFile(self, path, *parts):
+        """将若干数据块写入path；启用容器时写入容器成员，启用内容寻址存储时改为写入存储对象并链接到path"""
+        if self.container:
+            self._addWritten(self.container.add(self._containerName(path), *parts))
+            return
+
+        if not self.storeDir:
+            with self._openFresh(path) as f:
+                self._addWritten(sum(f.write(part) for part in parts))
+            return
+
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part)
+        objPath = self._storeObjectPath(digest.hexdigest())
+
+        if os.path.exists(objPath):
+            with self._statsLock:
+                self.dedupFiles += 1
+                self.dedupBytes += sum(len(part) for part in parts)
+        else:
+            # 先写临时文件再原子替换，多个进程同时写入同一对象也不会产生残缺文件
+            tmpPath = '{0}.{1}.tmp'.format(objPath, uuid.uuid4().hex)
+            with open(tmpPath, 'wb') as f:
+                self._addWritten(sum(f.write(part) for part in parts))
+            os.replace(tmpPath, objPath)
+
+        self._linkFromStore(objPath, path)
+
+    def _storeObjectPath(self, digest):
+        """存储对象路径：<storeDir>/<前两位>/<sha256>"""
+        objDir = os.path.join(self.storeDir, digest[:2])
+        self._makeDirs((objDir, ))
+        return os.path.join(objDir, digest)
+
+    def _linkFromStore(self, objPath, path):
+        """在解包目录中创建指向存储对象的硬链接，不支持时复制"""
+        if os.path.lexists(path):
+            os.remove(path)
+        try:
+            os.link(objPath, path)
+        except OSError:
+            shutil.copyfile(objPath, path)
+            self._addWritten(os.path.getsize(path))
+
+    def _adoptIntoStore(self, path):
+        """将已直接写盘的文件(如流式解压的大条目)纳入内容寻址存储"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.STREAM_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        objPath = self._storeObjectPath(digest.hexdigest())
+
+        try:
+            os.link(path, objPath)
+        except FileExistsError:
+            with self._statsLock:
+                self.dedupFiles += 1
+                self.dedupBytes += os.path.getsize(path)
+            self._linkFromStore(objPath, path)
+        except OSError:
+            pass
+
+    def _rawDataName(self, filepath):
+        """原始数据条目相对解包目录的输出路径"""
+        return filepath.replace('\\', os.path.sep).replace('/', os.path.sep).replace('..', '__')
+
+    def _rawDataPath(self, filepath):
+        """计算原始数据条目的输出路径，并确保其所在目录存在"""
+        nm = self._outPath(self._rawDataName(filepath))
+        self._makeDirs((os.path.dirname(nm), ))
+        return nm
+
+    def _makeDirs(self, dirs):
+        """
+        批量创建目录：按路径分量排序后只对叶子目录调用makedirs
+
+        已创建的目录及其父目录记入缓存，之后的写入无需再做存在性检查，可在任意线程调用。
+        容器模式下不创建任何目录
+        """
+        if self.containerFormat:
+            return
+
+        dirs = {os.path.normpath(path) for path in dirs if path} - self._createdDirs
+        leaves = []
+        for path in sorted(dirs, key=lambda path: path.split(os.sep), reverse=True):
+            if not leaves or not leaves[-1].startswith(path + os.sep):
+                leaves.append(path)
+
+        for path in leaves:
+            os.makedirs(path, exist_ok=True)
+            while path and path not in self._createdDirs:
+                self._createdDirs.add(path)
+                parent = os.path.dirname(path)
+                path = parent if parent != path else None
+
+    def _prepareOutputDirs(self, entries):
+        """根据CArchive目录表一次性创建全部条目的输出目录，代替逐文件的检查与创建"""
+        dirs = []
+        for entry in entries:
+            if entry.typeCmprsData in (b'd', b'o'):
+                continue
+            dirs.append(self._outPath(os.path.dirname(entry.name)))
+            if entry.typeCmprsData not in (b's', b'M', b'm'):
+                dirs.append(os.path.dirname(self._outPath(self._rawDataName(entry.name))))
+            if entry.typeCmprsData in (b'z', b'Z'):
+                dirs.append(self._outPath(entry.name + '_extracted'))
+        self._makeDirs(dirs)
+
     def _writeRawData(self, filepath, data):
         """写入原始数据到文件"""
-        nm = filepath.replace('\\', os.path.sep).replace('/', os.path.sep).replace('..', '__')
-        nmDir = os.path.dirname(nm)
-        if nmDir != '' and not os.path.exists(nmDir):
-            os.makedirs(nmDir)
+        self._writeFile(self._rawDataPath(filepath), data)
+
+    def _shouldStream(self, entry):
+        """
+        超过阈值的压缩数据条目走流式解压；字节码与PYZ条目仍需完整数据
+
+        按压缩与解压后两个大小中较大者判断，高压缩比的大条目同样不整体解压到内存
+        """
+        return entry.cmprsFlag == 1 and max(entry.cmprsdDataSize, entry.uncmprsdDataSize) > self.streamThreshold and \
+            entry.typeCmprsData not in (b's', b'M', b'm', b'z', b'Z', b'd', b'o')
 
-        with open(nm, 'wb') as f:
-            f.write(data)
+    def _streamRawData(self, entry):
+        """
+        以固定大小的块解压大条目并直接写盘，峰值内存与条目大小无关
 
-    def extractFiles(self):
-        """提取所有文件"""
+        返回需要在主线程输出的状态信息，成功且大小一致时返回None
+        """
+        nm = self._rawDataPath(entry.name)
+        size = 0
+
+        try:
+            with self._openOutput(nm) as f:
+                for chunk in self._iterInflated(entry):
+                    size += f.write(chunk)
+        except zlib.error:
+            if not self.container:
+                os.remove(nm)
+            return '[!] Error : Failed to decompress {0}'.format(entry.name)
+        finally:
+            self._addWritten(size)
+
+        if self.storeDir and not self.container:
+            self._adoptIntoStore(nm)
+
+        if size != entry.uncmprsdDataSize:
+            return '[!] Warning: Decompressed size mismatch for {0}'.format(entry.name)
+
+    def _iterInflated(self, entry):
+        """按固定大小的块解压条目并逐块产出，数据流不完整时抛出zlib.error"""
+        chunkSize = self.STREAM_CHUNK_SIZE
+        endPos = entry.position + entry.cmprsdDataSize
+        inflater = zlib.decompressobj()
+
+        for offset in range(entry.position, endPos, chunkSize):
+            data = self.fData[offset:min(offset + chunkSize, endPos)]
+            while data:
+                yield inflater.decompress(data, chunkSize)
+                data = inflater.unconsumed_tail
+        yield inflater.flush()
+
+        if not inflater.eof:
+            raise zlib.error('incomplete or truncated stream')
+
+    def _entryRecord(self, entry, outputs, extra=None):
+        """CArchive条目写盘完成后记入续传清单所需的参数"""
+        return (entry.name, entry.position, entry.cmprsdDataSize,
+                self.fData[entry.position:entry.position + entry.cmprsdDataSize], outputs, extra)
+
+    def _barePycRecord(self, entry):
+        """
+        不带魔数头的字节码条目(s/M)的清单参数，魔数尚未确定时将其加入待修复列表
+
+        此时写出的pyc魔数头为零，记录中标记bare_pyc，续传时据此检查魔数头是否已由_fixBarePycs修复
+        """
+        if self.pycMagic != b'\0' * 4:
+            return self._entryRecord(entry, [entry.name + '.pyc'])
+        self.barePycList.append(entry.name + '.pyc')
+        return self._entryRecord(entry, [entry.name + '.pyc'], {'bare_pyc': True})
+
+    def _isBarePyc(self, pycFile):
+        """已写出的pyc文件的魔数头是否仍为零"""
+        try:
+            with open(self._outPath(pycFile), 'rb') as f:
+                return f.read(4) == b'\0' * 4
+        except OSError:
+            return False
+
+    def _finishWrite(self, pending, source=None):
+        """
+        等待写入任务完成，在主线程中输出其返回的状态信息，并记入续传清单
+
+        递归提取时同时把输出文件记入来源索引，source为(所在归档, 归档类型)，默认为当前CArchive
+        """
+        future, record = pending
+        msg = future.result()
+        if msg:
+            self.status(msg)
+
+        if record is None:
+            return
+        if self.index is not None:
+            self._indexOutputs(record[4], source or (self._sourceName(), 'carchive'))
+        # 嵌套zip/tar成员没有CArchive内的位置，只进入来源索引
+        if self.manifest and record[1] is not None:
+            self._recordEntry(*record)
+
+    def _recordEntry(self, key, position, size, payload, outputs, extra=None):
+        """将已写盘的条目记入续传清单，输出文件缺失(如解压失败)时不记录"""
+        try:
+            self.manifest.add(key, position, size, payload, outputs, self.extractionDir, **(extra or {}))
+        except OSError:
+            pass
+
+    def _inflateForExtraction(self, entry):
+        """extractFiles使用的解压任务：需流式处理的条目返回None，续传时未变化的条目返回_UNCHANGED"""
+        if entry.name in self._unchanged and entry.typeCmprsData not in (b'z', b'Z'):
+            return _UNCHANGED
+        if self._shouldStream(entry):
+            return None
+        return self._inflateEntry(entry)
+
+    def _inflateEntry(self, entry):
+        """切片并解压单个CArchive条目，可在工作线程中执行"""
+        data = self.fData[entry.position:entry.position + entry.cmprsdDataSize]
+        if entry.cmprsFlag == 1:
+            data = zlib.decompress(data)
+        return data
+
+    def _iterOrdered(self, executor, window, fn, items):
+        """按输入顺序产出(参数, 任务)，同时在途的任务不超过window个"""
+        pending = deque()
+        for item in items:
+            pending.append((item, executor.submit(fn, *item)))
+            if len(pending) >= window:
+                yield pending.popleft()
+
+        while pending:
+            yield pending.popleft()
+
+    def extractFiles(self, workers=1, resume=False, recursive=False):
+        """提取所有文件
+
+        参数:
+            workers: 解压与写入使用的线程数，大于1时启用并行提取，输出与串行模式逐字节一致
+            resume: 启用增量/续传提取，在解包目录旁维护清单，仅重新提取缺失或变化的条目
+            recursive: 按魔数识别数据条目中嵌套的CArchive、PYZ、zip与tar并继续提取到同一目录树，
+                       在解包目录旁写出记录每个文件来源归档的索引
+        """
         self.status('[+] Beginning extraction...please standby')
         self.extractionDir = os.path.join(os.path.dirname(self.filePath), os.path.basename(self.filePath) + '_extracted')
+        self.rootDir = self.extractionDir
+
+        if self.containerFormat:
+            outputPath = self.containerPath or self.extractionDir + container.FORMATS[self.containerFormat]
+            self.status('[+] Writing output to {0} container: {1}'.format(self.containerFormat, outputPath))
+            if resume:
+                self.status('[!] Warning: Resume is not supported with container output, extracting all files')
+                resume = False
+            # 容器成员写入后无法原地修正魔数头，因此预先确定pyc魔数，避免产生裸pyc
+            if self.pycMagic == b'\0' * 4:
+                self.pycMagic = self._detectPycMagic()
+            self.container = container.open_container(outputPath, 'w', self.containerFormat)
 
-        if not os.path.exists(self.extractionDir):
+        elif not os.path.exists(self.extractionDir):
             os.mkdir(self.extractionDir)
 
-        os.chdir(self.extractionDir)
+        # 被过滤掉的条目既不解压也不写盘
+        selected = [entry for entry in self.tocList if self._wantEntry(entry)]
+        if len(selected) != len(self.tocList):
+            self.status('[+] Filters selected {0} of {1} files in CArchive'.format(len(selected), len(self.tocList)))
+
+        self._createdDirs = set()
+        self._prepareOutputDirs(selected)
+
+        # zlib解压会释放GIL，线程池即可利用多核；条目按TOC顺序处理以保证魔数头与串行模式一致。
+        # 写盘交给后台线程按提交顺序执行，与解压重叠
+        executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else _SerialExecutor()
+        window = workers * 4
+        writer = _BackgroundWriter(window)
+        writes = deque()
+
+        self._unchanged = {}
+        if resume:
+            self.manifest = _ExtractionManifest(self.extractionDir + self.MANIFEST_SUFFIX, self.fData,
+                                                self.filePath if self._buffer is None else None)
+            for entry in selected:
+                record = self.manifest.lookup(entry.name, entry.position, entry.cmprsdDataSize,
+                                              self.fData[entry.position:entry.position + entry.cmprsdDataSize],
+                                              self.extractionDir)
+                if record:
+                    self._unchanged[entry.name] = record
+            extractable = [entry for entry in selected if entry.typeCmprsData not in (b'd', b'o')]
+            self.status('[+] Resuming: {0} of {1} files unchanged since last extraction'.format(len(self._unchanged), len(extractable)))
+
+        self.index = [] if recursive else None
+        self._nested = deque() if recursive else None
+
+        completed = False
+        try:
+            self._extractEntries(selected, executor, writer, window, writes)
+            if recursive:
+                self._extractNested(executor, writer, window)
+            completed = True
+        finally:
+            executor.shutdown(wait=True)
+            writer.shutdown(wait=True)
+            if self.container:
+                self.container.close()
+                self.container = None
+            if self.manifest:
+                # 中断时也记下已完成的写入，下次续传即可跳过
+                for future, record in writes if not completed else ():
+                    if record is not None and future.exception() is None:
+                        self._recordEntry(*record)
+                self.manifest.close(compact=completed)
+                self.manifest = None
+            self._nested = None
+
+        if recursive:
+            self._writeIndex()
+
+        self._progress('complete', len(selected), len(selected), force=True)
+
+        if self.containerFormat:
+            self.status(f"[+] Extraction complete! Files written to: {outputPath}")
+            return outputPath
 
-        for i, entry in enumerate(self.tocList):
-            self.fPtr.seek(entry.position, os.SEEK_SET)
-            data = self.fPtr.read(entry.cmprsdDataSize)
+        self._fixBarePycs()
 
-            if entry.cmprsFlag == 1:
-                try:
-                    data = zlib.decompress(data)
-                except zlib.error:
-                    self.status('[!] Error : Failed to decompress {0}'.format(entry.name))
-                    continue
-                try:
-                    assert len(data) == entry.uncmprsdDataSize
-                except:
-                    self.status('[!] Warning: Decompressed size mismatch for {0}'.format(entry.name))
+        if self.storeDir:
+            self.status(f"[+] Content store: {self.dedupFiles} files ({self.dedupBytes} bytes) already present in {self.storeDir}")
+        
+        self.status(f"[+] Extraction complete! Files extracted to: {self.extractionDir}")
+        return self.extractionDir
 
-            if entry.typeCmprsData == b'd' or entry.typeCmprsData == b'o':
+    def _extractEntries(self, selected, executor, writer, window, writes):
+        """按TOC顺序解压并写出选中的CArchive条目，返回前等待全部写入完成"""
+        for i, ((entry, ), inflated) in enumerate(self._iterOrdered(executor, window, self._inflateForExtraction, ((entry, ) for entry in selected))):
+            self._progress('carchive', i + 1, len(selected), entry.name)
+            try:
+                data = inflated.result()
+            except zlib.error:
+                self.status('[!] Error : Failed to decompress {0}'.format(entry.name))
                 continue
 
-            basePath = os.path.dirname(entry.name)
-            if basePath != '':
-                if not os.path.exists(basePath):
-                    os.makedirs(basePath)
+            if entry.cmprsFlag == 1 and data is not None and data is not _UNCHANGED and len(data) != entry.uncmprsdDataSize:
+                self.status('[!] Warning: Decompressed size mismatch for {0}'.format(entry.name))
 
+            if entry.typeCmprsData == b'd' or entry.typeCmprsData == b'o':
+                continue
+
+            # 续传时未变化的入口脚本同样报告，与完整提取的输出一致
             if entry.typeCmprsData == b's':
                 self.status('[+] Possible entry point: {0}.pyc'.format(entry.name))
 
-                if self.pycMagic == b'\0' * 4:
+            if data is _UNCHANGED:
+                record = self._unchanged[entry.name]
+                self._keepUnchanged(record)
+                if self._nested is not None and entry.typeCmprsData not in (b's', b'M', b'm'):
+                    self._queueNestedOutput(self._rawDataName(entry.name), self.depth + 1)
+                if 'pyc_magic' in record and self.pycMagic == b'\0' * 4:
+                    self.pycMagic = bytes.fromhex(record['pyc_magic'])
+                # 上次中断在_fixBarePycs之前时，裸pyc的魔数头仍为零，需重新排队修复
+                if record.get('bare_pyc') and self._isBarePyc(entry.name + '.pyc'):
                     self.barePycList.append(entry.name + '.pyc')
-                self._writePyc(entry.name + '.pyc', data)
+
+            elif data is None:
+                writes.append((executor.submit(self._streamRawData, entry), self._entryRecord(entry, [self._rawDataName(entry.name)])))
+
+            elif entry.typeCmprsData == b's':
+                writes.append((writer.submit(self._writePyc, entry.name + '.pyc', data, self.pycMagic), self._barePycRecord(entry)))
 
             elif entry.typeCmprsData == b'M' or entry.typeCmprsData == b'm':
                 if data[2:4] == b'\r\n':
                     if self.pycMagic == b'\0' * 4: 
-                        self.pycMagic = data[0:4]
-                    self._writeRawData(entry.name + '.pyc', data)
+                        self.pycMagic = bytes(data[0:4])
+                    writes.append((writer.submit(self._writeRawData, entry.name + '.pyc', data), self._entryRecord(entry, [entry.name + '.pyc'], {'pyc_magic': bytes(data[0:4]).hex()})))
 
                 else:
-                    if self.pycMagic == b'\0' * 4:
-                        self.barePycList.append(entry.name + '.pyc')
-
-                    self._writePyc(entry.name + '.pyc', data)
+                    writes.append((writer.submit(self._writePyc, entry.name + '.pyc', data, self.pycMagic), self._barePycRecord(entry)))
 
             else:
-                self._writeRawData(entry.name, data)
+                if entry.name in self._unchanged:
+                    self._keepUnchanged(self._unchanged[entry.name])
+                else:
+                    writes.append((writer.submit(self._writeRawData, entry.name, data), self._entryRecord(entry, [self._rawDataName(entry.name)])))
 
                 if entry.typeCmprsData == b'z' or entry.typeCmprsData == b'Z':
-                    self._extractPyz(entry.name)
-                    
-            if i % 10 == 0 or i == len(self.tocList) - 1:
-                progress = int((i + 1) / len(self.tocList) * 100)
-                self.status(f"[+] Extracting files: {i+1}/{len(self.tocList)} ({progress}%)")
+                    self._extractPyz(entry.name, data, executor, window, writer)
+                elif self._nested is not None:
+                    self._queueNested(self._rawDataName(entry.name), data, self.depth + 1)
+
+            while len(writes) > window:
+                self._finishWrite(writes.popleft())
+
+        while writes:
+            self._finishWrite(writes.popleft())
+
+    def _sourceName(self):
+        """来源索引中当前CArchive的名称：最外层为程序文件名，嵌套归档为其相对解包目录的路径"""
+        if self.depth == 0:
+            return os.path.basename(self.filePath)
+        return self._containerName(self.filePath)
+
+    def _keepUnchanged(self, record, source=None):
+        """续传时保留未变化条目的清单记录，递归提取时把记录中的输出文件同样记入来源索引"""
+        self.manifest.keep(record)
+        if self.index is not None:
+            self._indexOutputs(list(record['outputs']), source or (self._sourceName(), 'carchive'))
+
+    def _queueNestedOutput(self, name, depth):
+        """续传时未变化的条目不再解压，从已写出的输出文件映射数据识别其中的嵌套归档"""
+        try:
+            with open(self._outPath(name), 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return
+        try:
+            self._queueNested(name, data, depth)
+        finally:
+            try:
+                data.close()
+            except BufferError:
+                pass
 
-        self._fixBarePycs()
-        
-        self.status(f"[+] Extraction complete! Files extracted to: {self.extractionDir}")
-        return self.extractionDir
+    def _indexOutputs(self, outputs, source):
+        """将输出文件(相对当前解包目录的路径)记入来源索引"""
+        sourceName, sourceType = source
+        for output in outputs:
+            self.index.append({
+                'path': self._containerName(self._outPath(output)),
+                'container': sourceName,
+                'container_type': sourceType,
+            })
+
+    def _writeIndex(self):
+        """在解包目录旁写出来源索引，每行一个输出文件"""
+        indexPath = self.extractionDir + self.INDEX_SUFFIX
+        with open(indexPath, 'w', encoding='utf-8') as f:
+            for record in self.index:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.status('[+] Provenance index of {0} files written to: {1}'.format(len(self.index), indexPath))
+
+    def _nestedKind(self, data):
+        """按魔数识别数据中嵌套的归档：pyz/zip/tar/carchive，不是归档时返回None"""
+        head = bytes(data[:4])
+        if head == b'PYZ\0':
+            return 'pyz'
+        if head == b'PK\x03\x04':
+            return 'zip'
+        if bytes(data[257:262]) == b'ustar':
+            return 'tar'
+
+        # 只接受cookie恰好位于负载末尾的CArchive，避免把偶然包含魔数的数据误判为归档
+        probe = PyInstArchive(data, self.filePath)
+        found = probe.open() and probe.fileSize >= self.PYINST21_COOKIE_SIZE and \
+            probe._trailingCookie(probe._payloadRegions() or [(0, probe.fileSize)]) != -1
+        probe.close()
+        return 'carchive' if found else None
+
+    def _queueNested(self, name, data, depth):
+        """
+        识别到嵌套归档时加入待提取队列，name为其相对当前解包目录的输出路径
+
+        队列中不保留数据本身，处理时从已写出的输出文件重新读取，多个大归档不会同时驻留内存；
+        容器模式下输出无法回读，数据暂存到临时文件
+        """
+        kind = self._nestedKind(data)
+        if kind is None:
+            return
+        if depth > self.MAX_NESTING:
+            self.status('[!] Warning: Nested archive {0} exceeds the maximum depth of {1}, skipped'.format(name, self.MAX_NESTING))
+            return
+
+        spool = None
+        if self.container:
+            spool = tempfile.TemporaryFile()
+            spool.write(data)
+        self._nested.append((self, name, kind, spool, depth))
+
+    def _openNested(self, name, spool):
+        """打开排队的嵌套归档数据，返回从头读取的文件对象，输出文件缺失时返回None"""
+        if spool is not None:
+            spool.seek(0)
+            return spool
+        try:
+            return open(self._outPath(name), 'rb')
+        except OSError:
+            return None
+
+    def _extractNested(self, executor, writer, window):
+        """
+        父归档提取完成后按发现顺序依次处理嵌套归档队列，每个归档内部的解压与写盘仍使用同一线程池与写盘线程
+
+        子归档提取到其输出文件旁的<名称>_extracted目录中，提取过程中发现的更深层归档继续入队
+        """
+        while self._nested:
+            owner, name, kind, spool, depth = self._nested.popleft()
+            self.status('[+] Extracting nested {0}: {1}'.format(kind, owner._containerName(owner._outPath(name))))
+
+            f = owner._openNested(name, spool)
+            if f is None:
+                self.status('[!] Warning: Output of nested archive {0} is missing, skipped'.format(name))
+                continue
+
+            with f:
+                if kind == 'pyz':
+                    pyzData = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    try:
+                        owner._extractPyz(name, pyzData, executor, window, writer)
+                    finally:
+                        try:
+                            pyzData.close()
+                        except BufferError:
+                            # 仍有成员切片被引用时交给垃圾回收释放映射
+                            pass
+                elif kind in ('zip', 'tar'):
+                    owner._extractBundle(name, kind, f, executor, window, writer, depth)
+                else:
+                    child = owner._nestedArchive(name, f, depth)
+                    if child is None:
+                        continue
+                    try:
+                        child._extractEntries(list(child.tocList), executor, writer, window, deque())
+                        if not child.containerFormat:
+                            child._fixBarePycs()
+                    finally:
+                        child.close()
+                        self.bytesWritten += child.bytesWritten
+                        self.pyzEntryCount += child.pyzEntryCount
+                        self.dedupFiles += child.dedupFiles
+                        self.dedupBytes += child.dedupBytes
+
+    def _nestedArchive(self, name, data, depth):
+        """
+        为嵌套的CArchive创建子解包器，共享输出目标、过滤条件与来源索引；无法解析时返回None
+
+        data可以是bytes-like对象或已打开的文件对象，后者由子解包器映射读取
+        """
+        child = PyInstArchive(data, self._outPath(name))
+        # 状态信息、警告计数与进度事件统一经由最外层解包器发出
+        child.status = self.status
+        child._progress = self._progress
+        child.set_filters(pyzInclude=self.pyzIncludePatterns, pyzExclude=self.pyzExcludePatterns)
+        child.storeDir = self.storeDir
+        child.set_decryption(*self._cryptoSettings, enabled=self.decryptPyz)
+        child.containerFormat = self.containerFormat
+        child.container = self.container
+        child.rootDir = self.rootDir
+        child.index = self.index
+        child.depth = depth
+        child._nested = self._nested
+        child._createdDirs = self._createdDirs
+        child.extractionDir = child.filePath + '_extracted'
+
+        if not (child.open() and child.checkFile() and child.getCArchiveInfo()):
+            child.close()
+            return None
+
+        child.parseTOC()
+        if child.containerFormat:
+            child.pycMagic = child._detectPycMagic()
+        child._prepareOutputDirs(child.tocList)
+        return child
+
+    def _extractBundle(self, name, kind, f, executor, window, writer, depth):
+        """提取嵌套的zip或tar包，f为其可seek的文件对象，成员写入<name>_extracted目录，成员中的归档继续入队"""
+        try:
+            if kind == 'zip':
+                bundle = zipfile.ZipFile(f)
+                members = [(info.filename, info) for info in bundle.infolist() if not info.is_dir()]
+                # zipfile支持多线程读取不同成员，解压可交给线程池
+                read, pool = bundle.read, executor
+            else:
+                bundle = tarfile.open(fileobj=f)
+                members = [(info.name, info) for info in bundle.getmembers() if info.isfile()]
+                read, pool = lambda info: bundle.extractfile(info).read(), _SerialExecutor()
+        except (zipfile.BadZipFile, tarfile.TarError, EOFError):
+            self.status('[!] Warning: {0} is not a valid {1} archive'.format(name, kind))
+            return
+
+        source = (self._containerName(self._outPath(name)), kind)
+        writes = deque()
+        with bundle:
+            for i, (_, loaded) in enumerate(self._iterOrdered(pool, window, read, ((info, ) for _, info in members))):
+                memberName = members[i][0]
+                try:
+                    memberData = loaded.result()
+                except Exception:
+                    self.status('[!] Error : Failed to read {0} from {1}'.format(memberName, name))
+                    continue
+
+                outName = self._rawDataName(os.path.join(name + '_extracted', memberName.lstrip('/')))
+                writes.append((writer.submit(self._writeRawData, outName, memberData), (outName, None, None, None, [outName], None)))
+                self._queueNested(outName, memberData, depth + 1)
+                while len(writes) > window:
+                    self._finishWrite(writes.popleft(), source)
+                self._progress(kind, i + 1, len(members), outName)
+
+            while writes:
+                self._finishWrite(writes.popleft(), source)
 
     def _fixBarePycs(self):
         """修复裸pyc文件的魔数头"""
         for pycFile in self.barePycList:
             try:
-                with open(pycFile, 'r+b') as pycFile:
-                    pycFile.write(self.pycMagic)
+                # 文件可能是指向存储对象的硬链接(包括之前启用存储时的输出)，不能原地修改，需重新写入
+                with open(self._outPath(pycFile), 'rb') as f:
+                    data = f.read()
+                self._writeFile(self._outPath(pycFile), self.pycMagic, data[len(self.pycMagic):])
             except:
                 pass
 
-    def _writePyc(self, filename, data):
-        """写入pyc文件，添加正确的魔数头"""
-        with open(filename, 'wb') as pycFile:
-            pycFile.write(self.pycMagic)
+    def _pycHeader(self, pycMagic):
+        """按归档的Python版本构造pyc文件头"""
+        if self.pymaj >= 3 and self.pymin >= 7:
+            return pycMagic + b'\0' * 4 + b'\0' * 8
 
-            if self.pymaj >= 3 and self.pymin >= 7:
-                pycFile.write(b'\0' * 4)
-                pycFile.write(b'\0' * 8)
+        elif self.pymaj >= 3 and self.pymin >= 3:
+            return pycMagic + b'\0' * 4 + b'\0' * 4
 
-            else:
-                pycFile.write(b'\0' * 4)
-                if self.pymaj >= 3 and self.pymin >= 3:
-                    pycFile.write(b'\0' * 4)
+        return pycMagic + b'\0' * 4
 
-            pycFile.write(data)
+    def _writePyc(self, filename, data, pycMagic=None):
+        """写入pyc文件，添加正确的魔数头；pycMagic为空时使用当前的self.pycMagic"""
+        self._writeFile(self._outPath(filename), self._pycHeader(self.pycMagic if pycMagic is None else pycMagic), data)
 
-    def _extractPyz(self, name):
-        """提取PYZ归档文件"""
+    def _extractPyz(self, name, pyzData, executor=None, window=1, writer=None):
+        """提取PYZ归档文件，所有成员均从同一缓冲区切片，由executor并行解压，writer按顺序写盘"""
+        executor = executor or _SerialExecutor()
+        writer = writer or _SerialExecutor()
         dirName =  name + '_extracted'
-        if not os.path.exists(dirName):
-            os.mkdir(dirName)
+        self._makeDirs((self._outPath(dirName), ))
+
+        pyzData = memoryview(pyzData)
+        pyzMagic = bytes(pyzData[0:4])
+        try:
+            assert pyzMagic == b'PYZ\0'
+        except:
+            self.status(f'[!] Warning: {name} is not a valid PYZ archive')
+            return
+
+        pyzPycMagic = bytes(pyzData[4:8])
+
+        if self.pycMagic == b'\0' * 4:
+            self.pycMagic = pyzPycMagic
+
+        elif self.pycMagic != pyzPycMagic:
+            self.pycMagic = pyzPycMagic
+            self.status('[!] Warning: pyc magic of files inside PYZ archive are different from those in CArchive')
+
+        pymaj = sys.version_info.major
+        pymin = sys.version_info.minor
+        if self.pymaj != pymaj or self.pymin != pymin:
+            self.status(f'[+] This script is running in Python {pymaj}.{pymin} but the archive was built with Python {self.pymaj}.{self.pymin}, using the built-in marshal reader')
+
+        try:
+            toc = self._loadPyzToc(pyzData)
+        except:
+            self.status('[!] Unmarshalling FAILED. Cannot extract {0}. Extracting remaining files.'.format(name))
+            return
+
+        self.status('[+] Found {0} files in PYZ archive'.format(len(toc)))
+        self.pyzEntryCount += len(toc)
+
+        if type(toc) == list:
+            toc = dict(toc)
+
+        source = (self._containerName(self._outPath(name)), 'pyz')
+        members = []
+        unchanged = 0
+        for fileName, ispkg, pos, memberData in self._iterPyzToc(toc, pyzData):
+            fileName = fileName.replace('..', '__').replace('.', os.path.sep)
+
+            if ispkg == 1:
+                filePath = os.path.join(dirName, fileName, '__init__.pyc')
 
-        with open(name, 'rb') as f:
-            pyzMagic = f.read(4)
+            else:
+                filePath = os.path.join(dirName, fileName + '.pyc')
+
+            if self.manifest:
+                record = self.manifest.lookup(filePath, pos, len(memberData), memberData, self.extractionDir)
+                if record and self._pyzRecordCurrent(record):
+                    self._keepUnchanged(record, source)
+                    unchanged += 1
+                    continue
+                if record:
+                    # 解密设置变化后重新处理，先删除上次的输出，避免.encrypted与.pyc并存
+                    self._removeOutputs(record['outputs'])
+
+            members.append((filePath, pos, memberData))
+
+        if len(members) + unchanged != len(toc):
+            self.status('[+] Filters selected {0} of {1} files in PYZ archive'.format(len(members) + unchanged, len(toc)))
+        if unchanged:
+            self.status('[+] Resuming: {0} files in PYZ archive unchanged since last extraction'.format(unchanged))
+
+        # 目录树一次性创建，工作线程只负责解压，写盘交给writer
+        self._makeDirs(self._outPath(os.path.dirname(member[0])) for member in members)
+
+        encrypted = next((memberData for _, _, memberData in members if not looks_like_zlib(memberData)), None)
+        if encrypted is not None and self.decryptPyz and not self._cryptoResolved:
+            self._resolveDecryption(encrypted)
+
+        pycMagic = self.pycMagic
+        crypto = self._cryptoRecord()
+        writes = deque()
+        decrypted = 0
+        tasks = self._iterOrdered(executor, window, self._inflatePyzMember, ((memberData, ) for _, _, memberData in members))
+        for i, (_, inflated) in enumerate(tasks):
+            filePath, pos, memberData = members[i]
+            state, data = inflated.result()
+            if state != 'encrypted':
+                decrypted += state == 'decrypted'
+                future = writer.submit(self._writePyc, filePath, data, pycMagic)
+                outputs = [filePath]
+            elif looks_like_zlib(memberData):
+                self.status('[!] Error: Failed to decompress {0}, data is corrupt. Extracting as is.'.format(filePath))
+                future = writer.submit(self._writeFile, self._outPath(filePath + '.encrypted'), data)
+                outputs = [filePath + '.encrypted']
+            else:
+                self.status('[!] Error: Failed to decompress {0}, probably encrypted. Extracting as is.'.format(filePath))
+                future = writer.submit(self._writeFile, self._outPath(filePath + '.encrypted'), data)
+                outputs = [filePath + '.encrypted']
+
+            writes.append((future, (filePath, pos, len(memberData), memberData, outputs, {'decryption': dict(crypto, state=state)})))
+            while len(writes) > window:
+                self._finishWrite(writes.popleft(), source)
+
+            self._progress('pyz', i + 1, len(members), filePath)
+
+        while writes:
+            self._finishWrite(writes.popleft(), source)
+
+        if decrypted:
+            self.status('[+] Decrypted {0} encrypted files in PYZ archive with AES-{1}'.format(decrypted, self.cryptoMode.upper()))
+
+    def _cryptoRecord(self):
+        """记入续传清单的解密设置：是否启用、调用方给定的模式与密钥(仅保存sha256摘要前缀)"""
+        key, mode = self._cryptoSettings
+        return {'enabled': self.decryptPyz, 'key': hashlib.sha256(key).hexdigest()[:16] if key is not None else None, 'mode': mode}
+
+    def _pyzRecordCurrent(self, record):
+        """
+        续传时判断PYZ成员记录在当前解密设置下是否仍然有效
+
+        直接解压的成员总是有效；上次解密或未能解密(输出.encrypted)的成员，
+        仅当本次的解密设置与记录一致时有效，旧清单中没有解密设置的记录视为失效
+        """
+        crypto = dict(record.get('decryption') or {})
+        if crypto.pop('state', None) != 'decrypted' and not any(name.endswith('.encrypted') for name in record['outputs']):
+            return True
+        return crypto == self._cryptoRecord()
+
+    def _removeOutputs(self, outputs):
+        """删除清单记录中的输出文件，文件已不存在时忽略"""
+        for name in outputs:
             try:
-                assert pyzMagic == b'PYZ\0'
-            except:
-                self.status(f'[!] Warning: {name} is not a valid PYZ archive')
-                return
+                os.remove(self._outPath(name))
+            except FileNotFoundError:
+                pass
 
-            pyzPycMagic = f.read(4)
+    def _inflatePyzMember(self, data):
+        """
+        解压单个PYZ成员，解压失败且已确定密钥与模式时解密后再解压，可在工作线程中执行
 
-            if self.pycMagic == b'\0' * 4:
-                self.pycMagic = pyzPycMagic
+        返回(状态, 数据)，状态为plain/decrypted/encrypted，encrypted时数据为原始字节
+        """
+        try:
+            return 'plain', zlib.decompress(data)
+        except zlib.error:
+            pass
 
-            elif self.pycMagic != pyzPycMagic:
-                self.pycMagic = pyzPycMagic
-                self.status('[!] Warning: pyc magic of files inside PYZ archive are different from those in CArchive')
+        if self.cryptoKey is not None and self.cryptoMode:
+            try:
+                return 'decrypted', decrypt_pyz_member(data, self.cryptoKey, self.cryptoMode)
+            except (zlib.error, ValueError):
+                pass
+        return 'encrypted', bytes(data)
+
+    def _resolveDecryption(self, sample):
+        """确定解密所用的密钥与模式，sample为一个无法直接解压的成员，用于试解密验证"""
+        self._cryptoResolved = True
+        keySource = 'supplied key'
+        keys = [self.cryptoKey]
+        if self.cryptoKey is None:
+            keys = self._findCryptoKeys()
+            keySource = 'key from {0}'.format(KEY_MODULE)
+        if not keys:
+            self.status('[!] Warning: PYZ archive contains encrypted files but no key was supplied or found in {0}'.format(KEY_MODULE))
+            return
+
+        # 优先使用归档模块中的标记(tinyaes/MODE_CFB)，再按登记顺序试解密确认
+        modes = [self.cryptoMode] if self.cryptoMode else []
+        modes += [mode for mode in [self._cryptoModeHint()] + scheme_names() if mode and mode not in modes]
+        failure = None
+        for key in keys:
+            for mode in modes:
+                try:
+                    decrypt_pyz_member(sample, key, mode)
+                except (zlib.error, ValueError):
+                    continue
+                except RuntimeError as e:
+                    failure = str(e)
+                    continue
+                self.cryptoKey = key
+                self.cryptoMode = mode
+                self.status('[+] Decrypting PYZ archive in memory with AES-{0}, {1}: {2}'.format(
+                    mode.upper(), keySource, key.decode('latin-1')))
+                return
 
-            pymaj = sys.version_info.major
-            pymin = sys.version_info.minor
-            if self.pymaj != pymaj or self.pymin != pymin:
-                self.status(f'[!] Warning: This script is running in Python {pymaj}.{pymin} but the archive was built with Python {self.pymaj}.{self.pymin}')
-                self.status('[!] Attempting to extract PYZ contents anyway...')
+        self.cryptoMode = None
+        self.status('[!] Warning: Could not decrypt PYZ archive with {0} ({1})'.format(
+            keySource, failure or 'wrong key or unsupported cipher'))
+
+    def _unmarshal(self, data):
+        """按归档的Python版本反序列化marshal数据，版本与当前解释器不一致时使用pymarshal"""
+        if (self.pymaj, self.pymin) == sys.version_info[:2]:
+            return marshal.loads(data)
+        return pymarshal.loads(data, (self.pymaj, self.pymin))
+
+    def _findCryptoKeys(self):
+        """
+        从CArchive中的pyimod00_crypto_key模块读取候选AES密钥，按出现顺序去重，未找到时返回空列表
+
+        与Decryptor.keys使用同一套规则(见pyzcrypt.iter_module_keys)：短密钥左侧补'0'，长字符串另取前16字节，
+        无法反序列化时原始扫描字符串记录
+        """
+        keys = []
+        for entry in self.tocList:
+            if os.path.basename(entry.name) != KEY_MODULE:
+                continue
+            try:
+                data = bytes(self._inflateEntry(entry))
+            except zlib.error:
+                continue
+            if data[2:4] == b'\r\n':
+                data = data[len(self._pycHeader(b'\0' * 4)):]
+
+            for key in iter_module_keys(data, self._unmarshal, True):
+                key = pad_key(key)
+                if len(key) in (16, 24, 32) and key not in keys:
+                    keys.append(key)
+        return keys
+
+    def _cryptoModeHint(self):
+        """根据CArchive中归档模块引用的AES实现推断模式：tinyaes为ctr，pycryptodome为cfb"""
+        for entry in self.tocList:
+            if not os.path.basename(entry.name).startswith('pyimod') or entry.typeCmprsData not in (b'm', b'M', b's'):
+                continue
+            try:
+                data = bytes(self._inflateEntry(entry))
+            except zlib.error:
+                continue
+            if b'tinyaes' in data or b'CTR_xcrypt_buffer' in data:
+                return 'ctr'
+            if b'MODE_CFB' in data or b'Crypto.Cipher' in data:
+                return 'cfb'
+        return None
 
-            (tocPosition, ) = struct.unpack('!i', f.read(4))
-            f.seek(tocPosition, os.SEEK_SET)
+    def _iterPyzToc(self, toc, pyzData):
+        """遍历PYZ目录表中满足过滤条件的成员，产出(模块名, ispkg, 偏移, 压缩数据切片)"""
+        for key, (ispkg, pos, length) in toc.items():
+            moduleName = key
 
             try:
-                toc = marshal.load(f)
+                moduleName = moduleName.decode('utf-8')
             except:
-                self.status('[!] Unmarshalling FAILED. Cannot extract {0}. Extracting remaining files.'.format(name))
-                return
+                pass
 
-            self.status('[+] Found {0} files in PYZ archive'.format(len(toc)))
+            if self._wantPyzMember(moduleName):
+                yield moduleName, ispkg, pos, pyzData[pos:pos + length]
 
-            if type(toc) == list:
-                toc = dict(toc)
+    def _loadPyzToc(self, pyzData):
+        """
+        读取PYZ头部指向的目录表，返回反序列化后的原始TOC(list或dict)
 
-            for i, key in enumerate(toc.keys()):
-                (ispkg, pos, length) = toc[key]
-                f.seek(pos, os.SEEK_SET)
-                fileName = key
+        归档的Python版本与当前解释器一致时使用marshal模块，否则使用纯Python的pymarshal，
+        因此任意版本的宿主解释器都能解析2.7及3.0-3.13构建的归档
+        """
+        (tocPosition, ) = struct.unpack_from('!i', pyzData, 8)
+        return self._unmarshal(pyzData[tocPosition:])
 
+    def _detectPycMagic(self):
+        """不解包地确定pyc魔数：优先取PYZ头中的魔数，其次取带头部的模块条目"""
+        for entry in self.tocList:
+            if entry.typeCmprsData in (b'z', b'Z'):
                 try:
-                    fileName = fileName.decode('utf-8')
-                except:
-                    pass
+                    pyzData = self._inflateEntry(entry)
+                except zlib.error:
+                    continue
+                if bytes(pyzData[0:4]) == b'PYZ\0':
+                    return bytes(pyzData[4:8])
+
+        for entry in self.tocList:
+            if entry.typeCmprsData in (b'M', b'm'):
+                try:
+                    data = self._inflateEntry(entry)
+                except zlib.error:
+                    continue
+                if data[2:4] == b'\r\n':
+                    return bytes(data[0:4])
 
-                fileName = fileName.replace('..', '__').replace('.', os.path.sep)
+        return b'\0' * 4
 
-                if ispkg == 1:
-                    filePath = os.path.join(dirName, fileName, '__init__.pyc')
+    @staticmethod
+    def _tryInflate(data):
+        """尝试解压数据，返回(是否成功, 字节数据)"""
+        try:
+            return True, zlib.decompress(data)
+        except zlib.error:
+            return False, bytes(data)
+
+    def iterMembers(self, workers=1):
+        """
+        不写盘地遍历归档中的全部成员(含PYZ内模块)，按TOC顺序产出ArchiveMember
+
+        字节码成员的raw_bytes为不含头部的marshal数据，可直接marshal.loads得到代码对象；
+        pyc_header与extractFiles写出的pyc头一致，二者拼接即为完整pyc。
+        过滤条件与extractFiles相同，需在parseTOC之后调用
+
+        参数:
+            workers: 并行解压的线程数
+        """
+        pycMagic = self._detectPycMagic()
+        pycHeader = self._pycHeader(pycMagic)
+        executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else _SerialExecutor()
+        window = workers * 4
+
+        selected = [entry for entry in self.tocList
+                    if self._wantEntry(entry) and entry.typeCmprsData not in (b'd', b'o')]
+        try:
+            tasks = self._iterOrdered(executor, window, self._inflateEntry, ((entry, ) for entry in selected))
+            for (entry, ), inflated in tasks:
+                try:
+                    data = bytes(inflated.result())
+                except zlib.error:
+                    self.status('[!] Error : Failed to decompress {0}'.format(entry.name))
+                    continue
 
-                else:
-                    filePath = os.path.join(dirName, fileName + '.pyc')
+                if entry.typeCmprsData == b's':
+                    yield ArchiveMember(entry.name, 'entry_point', data, pycHeader)
 
-                fileDir = os.path.dirname(filePath)
-                if not os.path.exists(fileDir):
-                    os.makedirs(fileDir)
+                elif entry.typeCmprsData == b'M' or entry.typeCmprsData == b'm':
+                    if data[2:4] == b'\r\n':
+                        yield ArchiveMember(entry.name, 'module', data[len(pycHeader):], data[:len(pycHeader)])
+                    else:
+                        yield ArchiveMember(entry.name, 'module', data, pycHeader)
+
+                elif entry.typeCmprsData == b'z' or entry.typeCmprsData == b'Z':
+                    yield ArchiveMember(entry.name, 'pyz', data, None)
+                    yield from self._iterPyzMembers(entry.name, data, executor, window)
 
-                try:
-                    data = f.read(length)
-                    data = zlib.decompress(data)
-                except:
-                    self.status('[!] Error: Failed to decompress {0}, probably encrypted. Extracting as is.'.format(filePath))
-                    open(filePath + '.encrypted', 'wb').write(data)
                 else:
-                    self._writePyc(filePath, data)
-                
-                if i % 20 == 0 or i == len(toc.keys()) - 1:
-                    progress = int((i + 1) / len(toc.keys()) * 100)
-                    self.status(f"[+] Extracting PYZ contents: {i+1}/{len(toc.keys())} ({progress}%)")
+                    yield ArchiveMember(entry.name, 'data', data, None)
+        finally:
+            executor.shutdown(wait=True)
+
+    def _iterPyzMembers(self, name, pyzData, executor, window):
+        """iterMembers的PYZ部分：并行解压PYZ成员并按目录表顺序产出"""
+        pyzData = memoryview(pyzData)
+        if bytes(pyzData[0:4]) != b'PYZ\0':
+            self.status(f'[!] Warning: {name} is not a valid PYZ archive')
+            return
+
+        try:
+            toc = self._loadPyzToc(pyzData)
+        except:
+            self.status('[!] Unmarshalling FAILED. Cannot extract {0}. Extracting remaining files.'.format(name))
+            return
+
+        if type(toc) == list:
+            toc = dict(toc)
+
+        pycHeader = self._pycHeader(bytes(pyzData[4:8]))
+        members = list(self._iterPyzToc(toc, pyzData))
+        tasks = self._iterOrdered(executor, window, self._tryInflate, ((data, ) for _, _, _, data in members))
+        for (moduleName, ispkg, _, _), (_, inflated) in zip(members, tasks):
+            ok, data = inflated.result()
+            if ok:
+                yield ArchiveMember(moduleName, 'pyz_package' if ispkg == 1 else 'pyz_module', data, pycHeader)
+            else:
+                yield ArchiveMember(moduleName, 'encrypted', data, None)
+
+    def triage(self):
+        """
+        仅读取cookie、CArchive目录表与PYZ目录表，不解压、不写盘地汇总归档信息
+
+        需在checkFile、getCArchiveInfo、parseTOC之后调用
+        """
+        info = {
+            'pyinstaller': '2.1+' if self.pyinstVer == 21 else '2.0',
+            'python': '{0}.{1}'.format(self.pymaj, self.pymin),
+            'entries': len(self.tocList),
+            'entry_points': [entry.name for entry in self.tocList if entry.typeCmprsData == b's'],
+            'crypto_key_module': any(os.path.basename(entry.name) == KEY_MODULE for entry in self.tocList),
+            'pyz': [],
+            'encrypted': False,
+        }
+
+        for entry in self.tocList:
+            if entry.typeCmprsData not in (b'z', b'Z'):
+                continue
+
+            pyzInfo = {'name': entry.name, 'members': None, 'encrypted_members': None}
+            info['pyz'].append(pyzInfo)
+            try:
+                pyzData = self._inflateEntry(entry)
+                if bytes(pyzData[0:4]) != b'PYZ\0':
+                    continue
+                toc = self._loadPyzToc(pyzData)
+            except Exception:
+                continue
+
+            members = toc.values() if type(toc) == dict else [value for _, value in toc]
+            # 仅检查每个成员的两字节zlib头，无法通过的即视为加密成员
+            encrypted = sum(1 for (_, pos, length) in members if not looks_like_zlib(pyzData[pos:pos + min(length, 2)]))
+            pyzInfo['members'] = len(members)
+            pyzInfo['encrypted_members'] = encrypted
+            info['encrypted'] = info['encrypted'] or encrypted > 0
+
+        return info
+
+    def verify(self, workers=1):
+        """
+        不解包、不写盘地校验归档完整性，返回逐条目的结果表(list of dict)
+
+        检查CArchive条目是否位于包数据区内且互不重叠、能否解压(zlib流自带Adler-32校验和)、
+        解压后大小是否与目录表一致、字节码能否反序列化为代码对象；PYZ条目的每个成员同样检查。
+        需在parseTOC之后调用
 
+        参数:
+            workers: 并行校验的线程数
+        """
+        executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else _SerialExecutor()
+        window = workers * 4
+        overlaps = self._overlappingEntries()
+        rows = []
 
-def extract_pyinstaller(exe_path, status_callback=None):
+        try:
+            tasks = self._iterOrdered(executor, window, self._verifyEntry, ((entry, ) for entry in self.tocList))
+            for i, ((entry, ), checked) in enumerate(tasks):
+                size, issues, pyzData = checked.result()
+                if entry in overlaps:
+                    issues.insert(0, 'overlaps {0}'.format(overlaps[entry]))
+                rows.append(self._verifyRow(entry.name, 'carchive', entry.typeCmprsData.decode('latin-1'), entry.position - self.overlayPos,
+                                            entry.cmprsdDataSize, entry.uncmprsdDataSize, size, issues))
+                if pyzData is not None:
+                    rows.extend(self._verifyPyz(entry.name, pyzData, executor, window))
+                self._progress('verify', i + 1, len(self.tocList), entry.name)
+        finally:
+            executor.shutdown(wait=True)
+
+        return rows
+
+    @staticmethod
+    def _verifyRow(name, source, kind, offset, compressed, expected, size, issues, encrypted=False):
+        """结果表中的一行，status为ok/encrypted/corrupt"""
+        return {
+            'name': name,
+            'source': source,
+            'type': kind,
+            'offset': offset,
+            'compressed_size': compressed,
+            'expected_size': expected,
+            'size': size,
+            'status': 'corrupt' if issues else 'encrypted' if encrypted else 'ok',
+            'issues': issues,
+        }
+
+    def _overlappingEntries(self):
+        """按偏移排序后一次扫描找出数据区间重叠的条目，返回{条目: 与其重叠的条目名}，越界条目单独报告，不参与比对"""
+        overlaps = {}
+        prevEnd, prevName = 0, None
+        entries = [entry for entry in self.tocList if entry.cmprsdDataSize and
+                   self.overlayPos <= entry.position and entry.position + entry.cmprsdDataSize <= self.tableOfContentsPos]
+        for entry in sorted(entries, key=lambda entry: entry.position):
+            if prevName is not None and entry.position < prevEnd:
+                overlaps[entry] = prevName
+            if entry.position + entry.cmprsdDataSize > prevEnd:
+                prevEnd, prevName = entry.position + entry.cmprsdDataSize, entry.name
+        return overlaps
+
+    def _verifyEntry(self, entry):
+        """
+        校验单个CArchive条目，可在工作线程中执行
+
+        返回(解压后大小, 问题列表, PYZ数据)，PYZ数据仅在条目为有效PYZ归档时给出，由主线程继续校验其成员
+        """
+        if entry.position < self.overlayPos or entry.position + entry.cmprsdDataSize > self.tableOfContentsPos:
+            return None, ['data out of bounds'], None
+        if entry.typeCmprsData in (b'd', b'o'):
+            return entry.uncmprsdDataSize, [], None
+
+        data = None
+        try:
+            if self._shouldStream(entry):
+                size = sum(len(chunk) for chunk in self._iterInflated(entry))
+            else:
+                data = self._inflateEntry(entry)
+                size = len(data)
+        except zlib.error as e:
+            return None, ['inflate failed: {0}'.format(e)], None
+
+        issues = []
+        if size != entry.uncmprsdDataSize:
+            issues.append('size mismatch: expected {0} bytes'.format(entry.uncmprsdDataSize))
+
+        if entry.typeCmprsData in (b's', b'M', b'm'):
+            issue = self._codeIssue(data)
+            if issue:
+                issues.append(issue)
+        elif entry.typeCmprsData in (b'z', b'Z'):
+            if bytes(data[0:4]) == b'PYZ\0':
+                return size, issues, data
+            issues.append('not a valid PYZ archive')
+
+        return size, issues, None
+
+    def _codeIssue(self, data):
+        """检查字节码能否反序列化为代码对象，返回问题描述，正常时返回None"""
+        if data[2:4] == b'\r\n':
+            data = data[len(self._pycHeader(b'\0' * 4)):]
+        try:
+            code = self._unmarshal(data)
+        except Exception as e:
+            return 'unmarshal failed: {0}'.format(e or type(e).__name__)
+        if not hasattr(code, 'co_code'):
+            return 'not a code object'
+        return None
+
+    def _verifyPyz(self, name, pyzData, executor, window):
+        """校验PYZ目录表及全部成员，按目录表顺序产出结果行"""
+        pyzData = memoryview(pyzData)
+        try:
+            (tocPosition, ) = struct.unpack_from('!i', pyzData, 8)
+            toc = self._loadPyzToc(pyzData)
+        except Exception as e:
+            yield self._verifyRow(name, 'pyz', 'toc', None, None, None, None, ['unmarshal failed: {0}'.format(e or type(e).__name__)])
+            return
+
+        members = []
+        for key, (ispkg, pos, length) in (toc.items() if type(toc) == dict else toc):
+            try:
+                key = key.decode('utf-8')
+            except:
+                pass
+            members.append((key, 'package' if ispkg == 1 else 'module', pos, length))
+
+        encrypted = next((pyzData[pos:pos + length] for _, _, pos, length in members
+                          if 12 <= pos and pos + length <= tocPosition and not looks_like_zlib(pyzData[pos:pos + 2])), None)
+        if encrypted is not None and self.decryptPyz and not self._cryptoResolved:
+            self._resolveDecryption(encrypted)
+
+        tasks = self._iterOrdered(executor, window, self._verifyPyzMember,
+                                  ((pyzData, pos, length, tocPosition) for _, _, pos, length in members))
+        for i, (_, checked) in enumerate(tasks):
+            moduleName, kind, pos, length = members[i]
+            state, size, issues = checked.result()
+            yield self._verifyRow(moduleName, name, kind, pos, length, None, size, issues, state == 'encrypted')
+
+    def _verifyPyzMember(self, pyzData, pos, length, tocPosition):
+        """
+        校验单个PYZ成员，可在工作线程中执行
+
+        以zlib头区分加密与损坏：带zlib头却无法解压的成员视为损坏，其余无法解压的成员视为加密(未能解密)
+        """
+        if pos < 12 or pos + length > tocPosition:
+            return None, None, ['data out of bounds']
+
+        state, data = self._inflatePyzMember(pyzData[pos:pos + length])
+        if state == 'encrypted':
+            if looks_like_zlib(data):
+                return state, None, ['inflate failed: corrupt zlib stream']
+            return state, None, []
+
+        issue = self._codeIssue(data)
+        return state, len(data), [issue] if issue else []
+
+
+def extract_pyinstaller(exe_path, status_callback=None, workers=1, filters=None, resume=False, store=None, container=None, recursive=False,
+                        progress_callback=None, key=None, decrypt=True, name=None):
     """
     便捷函数：解包PyInstaller程序
     
     参数:
-        exe_path: PyInstaller打包的exe文件路径
+        exe_path: PyInstaller打包的exe文件路径，也可以是bytes-like对象或可seek的二进制流
         status_callback: 状态回调函数，用于显示进度信息
+        workers: 并行解压的线程数，默认为1即串行提取
+        filters: 选择性提取的过滤条件，参数同PyInstArchive.set_filters
+        resume: 增量/续传提取，仅重新提取缺失或变化的条目
+        store: 内容寻址存储目录，相同内容的文件跨样本只写一次
+        container: 单文件容器格式(zip/tar/sqlite)，指定时输出到<程序名>_extracted.<扩展名>
+        recursive: 递归提取嵌套的CArchive、PYZ、zip与tar，并写出来源索引
+        progress_callback: 进度回调函数，接收合并限速后的ProgressEvent
+        key: PYZ加密密钥，为空时从归档内的pyimod00_crypto_key读取
+        decrypt: 是否在提取时直接解密PYZ加密成员，为False时输出.encrypted文件
+        name: exe_path为内存数据时的样本名称，决定解包目录名
     
     返回:
-        成功时返回解包目录路径，失败时返回None
+        成功时返回解包目录(或容器文件)路径，失败时返回None
     """
     try:
-        archive = PyInstArchive(exe_path)
+        archive = PyInstArchive(exe_path, name)
         if status_callback:
             archive.set_status_callback(status_callback)
+        if progress_callback:
+            archive.subscribe(progress_callback)
+        archive.set_decryption(key, enabled=decrypt)
+        if filters:
+            archive.set_filters(**filters)
+        if store:
+            archive.set_content_store(store)
+        if container:
+            archive.set_output_container(container)
         
         if archive.open():
             if archive.checkFile():
                 if archive.getCArchiveInfo():
                     archive.parseTOC()
-                    extraction_dir = archive.extractFiles()
+                    extraction_dir = archive.extractFiles(workers, resume, recursive)
                     archive.close()
                     return extraction_dir
             
@@ -400,19 +2007,335 @@ def extract_pyinstaller(exe_path, status_callback=None):
         return None
 
 
+def triage_pyinstaller(exe_path, name=None):
+    """
+    便捷函数：快速识别PyInstaller程序，不向磁盘写入任何内容
+
+    参数:
+        exe_path: 文件路径，也可以是bytes-like对象或可seek的二进制流
+        name: exe_path为内存数据时记录中使用的名称
+
+    返回:
+        结果记录(dict)，is_pyinstaller为False时其余字段为空
+    """
+    start = time.perf_counter()
+    archive = PyInstArchive(exe_path, name)
+    record = {'path': archive.filePath, 'is_pyinstaller': False}
+    archive.set_status_callback(lambda msg: None)
+    try:
+        if archive.open():
+            record['path'] = archive.filePath
+            if archive.checkFile() and archive.getCArchiveInfo():
+                archive.parseTOC()
+                record.update(archive.triage())
+                record['is_pyinstaller'] = True
+    except Exception as e:
+        record['error'] = str(e)
+    finally:
+        archive.close()
+
+    record['elapsed'] = round(time.perf_counter() - start, 6)
+    return record
+
+
+def triage_pyinstaller_batch(patterns, jobs=None):
+    """
+    批量识别：使用进程池对大量文件执行triage_pyinstaller
+
+    返回:
+        生成器，按完成顺序产出每个文件的结果记录(dict)
+    """
+    targets = list(iter_pyinstaller_targets(patterns))
+    if not targets:
+        return
+
+    jobs = min(jobs or os.cpu_count() or 1, len(targets))
+    if jobs == 1:
+        for path in targets:
+            yield triage_pyinstaller(path)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for record in pool.map(triage_pyinstaller, targets, chunksize=64):
+            yield record
+
+
+def verify_pyinstaller(exe_path, workers=1, key=None, decrypt=True, name=None):
+    """
+    便捷函数：校验PyInstaller程序的完整性，不解包、不向磁盘写入任何内容
+
+    参数:
+        exe_path: 文件路径，也可以是bytes-like对象或可seek的二进制流
+        workers: 并行校验的线程数
+        key: PYZ加密密钥，为空时从pyimod00_crypto_key读取
+        decrypt: 是否解密PYZ加密成员后再校验，为False时加密成员仅标记为encrypted
+        name: exe_path为内存数据时记录中使用的名称
+
+    返回:
+        结果记录(dict)，entries为逐条目的结果表，corrupt/encrypted为对应状态的条目数
+    """
+    start = time.perf_counter()
+    archive = PyInstArchive(exe_path, name)
+    record = {'path': archive.filePath, 'is_pyinstaller': False}
+    archive.set_status_callback(lambda msg: None)
+    archive.set_decryption(key, enabled=decrypt)
+    try:
+        if archive.open():
+            record['path'] = archive.filePath
+            if archive.checkFile() and archive.getCArchiveInfo():
+                archive.parseTOC()
+                rows = archive.verify(workers)
+                record['is_pyinstaller'] = True
+                record['checked'] = len(rows)
+                record['corrupt'] = sum(row['status'] == 'corrupt' for row in rows)
+                record['encrypted'] = sum(row['status'] == 'encrypted' for row in rows)
+                record['entries'] = rows
+    except Exception as e:
+        record['error'] = str(e)
+    finally:
+        archive.close()
+
+    record['elapsed'] = round(time.perf_counter() - start, 6)
+    return record
+
+
+def verify_pyinstaller_batch(patterns, jobs=None, workers=1, key=None, decrypt=True):
+    """
+    批量校验：使用进程池对多个文件执行verify_pyinstaller
+
+    返回:
+        生成器，按完成顺序产出每个文件的结果记录(dict)
+    """
+    targets = list(iter_pyinstaller_targets(patterns))
+    if not targets:
+        return
+
+    jobs = min(jobs or os.cpu_count() or 1, len(targets))
+    if jobs == 1:
+        for path in targets:
+            yield verify_pyinstaller(path, workers, key, decrypt)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(verify_pyinstaller, path, workers, key, decrypt) for path in targets]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def _is_extraction_output(pattern, match, outputSuffixes):
+    """通配符匹配到的路径是否为解包输出：通配部分的任一级目录以_extracted结尾，或文件名带输出后缀"""
+    # 通配符之前的固定前缀由用户给出，不参与判断
+    parts = os.path.normpath(pattern).split(os.sep)
+    fixed = 0
+    while fixed < len(parts) and not glob.has_magic(parts[fixed]):
+        fixed += 1
+    names = os.path.normpath(match).split(os.sep)[fixed:]
+    if any(name.endswith('_extracted') for name in names):
+        return True
+    return bool(names) and os.path.isfile(match) and names[-1].endswith(outputSuffixes)
+
+
+def iter_pyinstaller_targets(patterns):
+    """
+    展开命令行给出的文件、目录与通配符，产出待解包的文件路径
+
+    目录会被递归遍历，已有的*_extracted解包输出目录、容器文件、续传清单及来源索引会被跳过；
+    通配符匹配到的路径同样按此过滤(包括**匹配到的输出目录中的文件)，直接给出的路径不受影响
+    """
+    outputSuffixes = (PyInstArchive.MANIFEST_SUFFIX, PyInstArchive.INDEX_SUFFIX) + tuple('_extracted' + ext for ext in container.FORMATS.values())
+    seen = set()
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = [match for match in glob.glob(pattern, recursive=True) if not _is_extraction_output(pattern, match, outputSuffixes)]
+        else:
+            matches = [pattern]
+        for match in sorted(matches):
+            if os.path.isdir(match):
+                candidates = []
+                for root, dirs, files in os.walk(match):
+                    dirs[:] = sorted(d for d in dirs if not d.endswith('_extracted'))
+                    candidates.extend(os.path.join(root, f) for f in sorted(files)
+                                      if not f.endswith(outputSuffixes))
+            else:
+                candidates = [match]
+
+            for path in candidates:
+                key = os.path.abspath(path)
+                if key not in seen and os.path.isfile(path):
+                    seen.add(key)
+                    yield path
+
+
+def _extract_batch_sample(exe_path, workers, filters=None, resume=False, store=None, container=None, recursive=False,
+                          key=None, decrypt=True):
+    """批量模式的单样本任务，在子进程中执行并返回结果记录"""
+    record = {
+        'path': exe_path,
+        'status': 'failed',
+        'python': None,
+        'entries': 0,
+        'pyz_entries': 0,
+        'bytes_written': 0,
+        'deduplicated_bytes': 0,
+        'elapsed': 0.0,
+        'output': None,
+        'error': None,
+        'warnings': 0,
+    }
+    errors = []
+
+    def collect(msg):
+        if msg.startswith('[!]'):
+            errors.append(msg)
+
+    start = time.perf_counter()
+    archive = PyInstArchive(exe_path)
+    archive.set_status_callback(collect)
+    archive.set_decryption(key, enabled=decrypt)
+    if filters:
+        archive.set_filters(**filters)
+    if store:
+        archive.set_content_store(store)
+    if container:
+        archive.set_output_container(container)
+    try:
+        if archive.open():
+            if archive.checkFile() and archive.getCArchiveInfo():
+                record['python'] = '{0}.{1}'.format(archive.pymaj, archive.pymin)
+                archive.parseTOC()
+                record['entries'] = len(archive.tocList)
+                record['output'] = archive.extractFiles(workers, resume, recursive)
+                record['status'] = 'ok'
+            archive.close()
+    except Exception as e:
+        record['status'] = 'error'
+        errors.append(f"[!] 解包过程中发生错误: {str(e)}")
+        archive.close()
+
+    record['pyz_entries'] = archive.pyzEntryCount
+    record['bytes_written'] = archive.bytesWritten
+    record['deduplicated_bytes'] = archive.dedupBytes
+    record['elapsed'] = round(time.perf_counter() - start, 3)
+    record['warnings'] = len(errors)
+    if errors and record['status'] != 'ok':
+        record['error'] = errors[-1]
+    return record
+
+
+def extract_pyinstaller_batch(patterns, jobs=None, workers=1, filters=None, resume=False, store=None, container=None, recursive=False,
+                              key=None, decrypt=True):
+    """
+    批量解包：使用进程池并行解包多个PyInstaller程序
+
+    参数:
+        patterns: 文件路径、目录或通配符列表
+        jobs: 进程池大小，默认为CPU核心数
+        workers: 每个样本内部并行解压的线程数
+        filters: 选择性提取的过滤条件，参数同PyInstArchive.set_filters
+        resume: 增量/续传提取，仅重新提取缺失或变化的条目
+        store: 内容寻址存储目录，所有样本共享
+        container: 单文件容器格式(zip/tar/sqlite)，每个样本输出一个容器文件
+        recursive: 递归提取嵌套归档，每个样本写出来源索引
+        key: PYZ加密密钥，为空时从各样本的pyimod00_crypto_key读取
+        decrypt: 是否在提取时直接解密PYZ加密成员
+
+    返回:
+        生成器，按完成顺序产出每个样本的结果记录(dict)
+    """
+    targets = list(iter_pyinstaller_targets(patterns))
+    if not targets:
+        return
+
+    jobs = min(jobs or os.cpu_count() or 1, len(targets))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(_extract_batch_sample, path, workers, filters, resume, store, container, recursive, key, decrypt): path for path in targets}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                yield {'path': futures[future], 'status': 'error', 'error': str(e)}
+
+
 if __name__ == "__main__":
     """命令行使用示例"""
-    if len(sys.argv) != 2:
-        print("用法: python pyinstxtractor.py <PyInstaller程序路径>")
-        sys.exit(1)
-    
-    exe_path = sys.argv[1]
-    if not os.path.exists(exe_path):
-        print(f"错误: 文件 {exe_path} 不存在")
+    import argparse
+
+    parser = argparse.ArgumentParser(description='解包PyInstaller程序，给出多个路径、目录或通配符时使用进程池批量解包')
+    parser.add_argument('paths', nargs='+', help='PyInstaller程序路径、目录或通配符')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='批量模式的进程数，默认为CPU核心数')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='单个样本内部并行解压的线程数')
+    parser.add_argument('-o', '--report', help='批量模式下将结果记录以JSON Lines格式写入该文件，默认输出到标准输出')
+    parser.add_argument('--include', action='append', help='仅提取名称匹配该通配符的CArchive条目，可重复指定')
+    parser.add_argument('--exclude', action='append', help='跳过名称匹配该通配符的CArchive条目，可重复指定')
+    parser.add_argument('--types', help='仅提取这些类型的CArchive条目，如sMmz只提取字节码与PYZ')
+    parser.add_argument('--pyz-include', action='append', help='仅提取匹配该模式的PYZ模块，如myapp.*，可重复指定')
+    parser.add_argument('--pyz-exclude', action='append', help='跳过匹配该模式的PYZ模块，如encodings.*，可重复指定')
+    parser.add_argument('-r', '--resume', action='store_true', help='增量/续传提取：根据解包目录旁的清单仅重新提取缺失或变化的条目')
+    parser.add_argument('-s', '--store', help='内容寻址存储目录：输出文件按内容哈希存放并硬链接到解包目录，跨样本去重')
+    parser.add_argument('-c', '--container', choices=sorted(container.FORMATS), help='将解包结果写入单个不压缩的zip/tar/SQLite容器文件，而非大量松散文件')
+    parser.add_argument('-R', '--recursive', action='store_true', help='递归提取嵌套的CArchive、PYZ、zip与tar，并在解包目录旁写出记录文件来源的索引')
+    parser.add_argument('-k', '--key', help='PYZ加密密钥，默认从归档内的pyimod00_crypto_key读取')
+    parser.add_argument('--no-decrypt', action='store_true', help='不在提取时解密PYZ加密成员，按原样输出.encrypted文件')
+    parser.add_argument('-t', '--triage', action='store_true', help='仅识别归档信息(版本、入口点、是否加密)，不解包、不写盘')
+    parser.add_argument('-V', '--verify', action='store_true', help='仅校验归档完整性(数据边界、解压大小、字节码)，输出逐条目的结果表，不解包、不写盘')
+    args = parser.parse_args()
+    filters = {
+        'include': args.include,
+        'exclude': args.exclude,
+        'types': args.types,
+        'pyzInclude': args.pyz_include,
+        'pyzExclude': args.pyz_exclude,
+    }
+
+    if args.triage:
+        report = open(args.report, 'w', encoding='utf-8') if args.report else sys.stdout
+        try:
+            for record in triage_pyinstaller_batch(args.paths, args.jobs):
+                report.write(json.dumps(record, ensure_ascii=False) + '\n')
+        finally:
+            if report is not sys.stdout:
+                report.close()
+        sys.exit(0)
+
+    if args.verify:
+        report = open(args.report, 'w', encoding='utf-8') if args.report else sys.stdout
+        intact = True
+        try:
+            for record in verify_pyinstaller_batch(args.paths, args.jobs, args.workers, args.key, not args.no_decrypt):
+                intact = intact and record['is_pyinstaller'] and not record['corrupt']
+                report.write(json.dumps(record, ensure_ascii=False) + '\n')
+        finally:
+            if report is not sys.stdout:
+                report.close()
+        sys.exit(0 if intact else 1)
+
+    if len(args.paths) == 1 and os.path.isfile(args.paths[0]):
+        result = extract_pyinstaller(args.paths[0], workers=args.workers, filters=filters, resume=args.resume, store=args.store, container=args.container, recursive=args.recursive,
+                                     progress_callback=lambda event: event.stage != 'complete' and print(describe_progress(event)),
+                                     key=args.key, decrypt=not args.no_decrypt)
+        if result:
+            print(f"解包成功！文件保存在: {result}")
+        else:
+            print("解包失败！")
+            sys.exit(1)
+        sys.exit(0)
+
+    if len(args.paths) == 1 and not glob.has_magic(args.paths[0]) and not os.path.exists(args.paths[0]):
+        print(f"错误: 文件 {args.paths[0]} 不存在")
         sys.exit(1)
-    
-    result = extract_pyinstaller(exe_path)
-    if result:
-        print(f"解包成功！文件保存在: {result}")
-    else:
-        print("解包失败！")
+
+    report = open(args.report, 'w', encoding='utf-8') if args.report else sys.stdout
+    total = ok = 0
+    try:
+        for record in extract_pyinstaller_batch(args.paths, args.jobs, args.workers, filters, args.resume, args.store, args.container, args.recursive,
+                                                args.key, not args.no_decrypt):
+            total += 1
+            ok += record['status'] == 'ok'
+            report.write(json.dumps(record, ensure_ascii=False) + '\n')
+            report.flush()
+    finally:
+        if report is not sys.stdout:
+            report.close()
+
+    print(f"批量解包完成: 成功 {ok}/{total}", file=sys.stderr)
+    sys.exit(0 if ok == total else 1)
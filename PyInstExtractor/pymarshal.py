@@ -0,0 +1,256 @@
+import struct
+
+
+# marshal类型码，参见CPython Python/marshal.c
+TYPE_NULL = ord('0')
+TYPE_NONE = ord('N')
+TYPE_FALSE = ord('F')
+TYPE_TRUE = ord('T')
+TYPE_STOPITER = ord('S')
+TYPE_ELLIPSIS = ord('.')
+TYPE_INT = ord('i')
+TYPE_INT64 = ord('I')
+TYPE_FLOAT = ord('f')
+TYPE_BINARY_FLOAT = ord('g')
+TYPE_COMPLEX = ord('x')
+TYPE_BINARY_COMPLEX = ord('y')
+TYPE_LONG = ord('l')
+TYPE_STRING = ord('s')
+TYPE_INTERNED = ord('t')
+TYPE_STRINGREF = ord('R')
+TYPE_REF = ord('r')
+TYPE_TUPLE = ord('(')
+TYPE_LIST = ord('[')
+TYPE_DICT = ord('{')
+TYPE_CODE = ord('c')
+TYPE_UNICODE = ord('u')
+TYPE_UNKNOWN = ord('?')
+TYPE_SET = ord('<')
+TYPE_FROZENSET = ord('>')
+TYPE_ASCII = ord('a')
+TYPE_ASCII_INTERNED = ord('A')
+TYPE_SMALL_TUPLE = ord(')')
+TYPE_SHORT_ASCII = ord('z')
+TYPE_SHORT_ASCII_INTERNED = ord('Z')
+FLAG_REF = 0x80
+
+# 3.11+ co_localspluskinds中的变量类别
+CO_FAST_LOCAL = 0x20
+CO_FAST_CELL = 0x40
+CO_FAST_FREE = 0x80
+
+_INT32 = struct.Struct('<i')
+_UINT32 = struct.Struct('<I')
+_INT64 = struct.Struct('<q')
+_DOUBLE = struct.Struct('<d')
+_UINT16 = struct.Struct('<H')
+
+
+class Code:
+    """与宿主解释器无关的代码对象，字段名与对应版本的co_*属性一致"""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def __repr__(self):
+        return '<code object {0} at "{1}", line {2}>'.format(
+            getattr(self, 'co_name', '?'), getattr(self, 'co_filename', '?'), getattr(self, 'co_firstlineno', 0))
+
+
+class MarshalReader:
+    """
+    纯Python实现的marshal反序列化器，支持Python 2.7及3.0-3.13写出的数据
+
+    version为写出数据的Python版本(major, minor)，仅影响代码对象的字段布局
+    """
+
+    def __init__(self, data, version):
+        self.data = memoryview(data)
+        self.pos = 0
+        self.version = tuple(version[:2])
+        self.refs = []
+        self.interned = []
+
+    def _read(self, n):
+        if self.pos + n > len(self.data):
+            raise EOFError('marshal data too short')
+        chunk = self.data[self.pos:self.pos + n]
+        self.pos += n
+        return chunk
+
+    def _byte(self):
+        if self.pos >= len(self.data):
+            raise EOFError('marshal data too short')
+        value = self.data[self.pos]
+        self.pos += 1
+        return value
+
+    def _int32(self):
+        value = _INT32.unpack_from(self.data, self.pos)[0]
+        self.pos += 4
+        return value
+
+    def _size(self):
+        size = _UINT32.unpack_from(self.data, self.pos)[0]
+        self.pos += 4
+        return size
+
+    def _reserve(self, flag):
+        """为带FLAG_REF的容器对象预留引用槽位，子对象可能引用它"""
+        if not flag:
+            return None
+        self.refs.append(None)
+        return len(self.refs) - 1
+
+    def _ref(self, index, obj):
+        if index is not None:
+            self.refs[index] = obj
+        return obj
+
+    def load(self):
+        """读取一个对象"""
+        code = self._byte()
+        flag = code & FLAG_REF
+        code &= ~FLAG_REF
+
+        if code == TYPE_NONE:
+            return None
+        if code == TYPE_NULL:
+            return None
+        if code == TYPE_TRUE:
+            return True
+        if code == TYPE_FALSE:
+            return False
+        if code == TYPE_ELLIPSIS:
+            return Ellipsis
+        if code == TYPE_STOPITER:
+            return StopIteration
+
+        if code == TYPE_REF:
+            return self.refs[self._size()]
+
+        if code in (TYPE_SHORT_ASCII, TYPE_SHORT_ASCII_INTERNED):
+            return self._ref(self._reserve(flag), str(self._read(self._byte()), 'latin-1'))
+        if code in (TYPE_ASCII, TYPE_ASCII_INTERNED):
+            return self._ref(self._reserve(flag), str(self._read(self._size()), 'latin-1'))
+        if code == TYPE_UNICODE:
+            return self._ref(self._reserve(flag), str(self._read(self._size()), 'utf-8', 'surrogatepass'))
+        if code == TYPE_INTERNED:
+            if self.version[0] == 2:
+                value = bytes(self._read(self._size()))
+                self.interned.append(value)
+                return value
+            return self._ref(self._reserve(flag), str(self._read(self._size()), 'utf-8', 'surrogatepass'))
+        if code == TYPE_STRINGREF:
+            return self.interned[self._size()]
+        if code == TYPE_STRING:
+            return self._ref(self._reserve(flag), bytes(self._read(self._size())))
+
+        if code == TYPE_INT:
+            return self._ref(self._reserve(flag), self._int32())
+        if code == TYPE_INT64:
+            value = _INT64.unpack_from(self.data, self.pos)[0]
+            self.pos += 8
+            return self._ref(self._reserve(flag), value)
+        if code == TYPE_LONG:
+            count = self._int32()
+            value = 0
+            for i in range(abs(count)):
+                value |= _UINT16.unpack_from(self.data, self.pos + 2 * i)[0] << (15 * i)
+            self.pos += 2 * abs(count)
+            return self._ref(self._reserve(flag), -value if count < 0 else value)
+        if code == TYPE_BINARY_FLOAT:
+            value = _DOUBLE.unpack_from(self.data, self.pos)[0]
+            self.pos += 8
+            return self._ref(self._reserve(flag), value)
+        if code == TYPE_FLOAT:
+            return self._ref(self._reserve(flag), float(bytes(self._read(self._byte()))))
+        if code == TYPE_BINARY_COMPLEX:
+            real, imag = struct.unpack_from('<dd', self.data, self.pos)
+            self.pos += 16
+            return self._ref(self._reserve(flag), complex(real, imag))
+        if code == TYPE_COMPLEX:
+            real = float(bytes(self._read(self._byte())))
+            imag = float(bytes(self._read(self._byte())))
+            return self._ref(self._reserve(flag), complex(real, imag))
+
+        if code in (TYPE_TUPLE, TYPE_SMALL_TUPLE):
+            index = self._reserve(flag)
+            count = self._byte() if code == TYPE_SMALL_TUPLE else self._size()
+            return self._ref(index, tuple([self.load() for _ in range(count)]))
+        if code == TYPE_LIST:
+            value = []
+            self._ref(self._reserve(flag), value)
+            value.extend(self.load() for _ in range(self._size()))
+            return value
+        if code == TYPE_DICT:
+            value = {}
+            self._ref(self._reserve(flag), value)
+            while True:
+                if self.data[self.pos] == TYPE_NULL:
+                    self.pos += 1
+                    return value
+                key = self.load()
+                value[key] = self.load()
+        if code in (TYPE_SET, TYPE_FROZENSET):
+            index = self._reserve(flag)
+            items = [self.load() for _ in range(self._size())]
+            return self._ref(index, set(items) if code == TYPE_SET else frozenset(items))
+
+        if code == TYPE_CODE:
+            index = self._reserve(flag)
+            return self._ref(index, self._loadCode())
+
+        raise ValueError('bad marshal data (unknown type code {0!r} at offset {1})'.format(chr(code), self.pos - 1))
+
+    def _loadCode(self):
+        """按版本读取代码对象的字段"""
+        major, minor = self.version
+        fields = {}
+
+        fields['co_argcount'] = self._int32()
+        if major >= 3 and minor >= 8:
+            fields['co_posonlyargcount'] = self._int32()
+        if major >= 3:
+            fields['co_kwonlyargcount'] = self._int32()
+        if major < 3 or minor < 11:
+            fields['co_nlocals'] = self._int32()
+        fields['co_stacksize'] = self._int32()
+        fields['co_flags'] = self._int32()
+        fields['co_code'] = self.load()
+        fields['co_consts'] = self.load()
+        fields['co_names'] = self.load()
+
+        if major >= 3 and minor >= 11:
+            names = self.load()
+            kinds = self.load()
+            fields['co_localsplusnames'] = names
+            fields['co_localspluskinds'] = kinds
+            fields['co_varnames'] = tuple(n for n, k in zip(names, kinds) if k & CO_FAST_LOCAL)
+            fields['co_cellvars'] = tuple(n for n, k in zip(names, kinds) if k & CO_FAST_CELL)
+            fields['co_freevars'] = tuple(n for n, k in zip(names, kinds) if k & CO_FAST_FREE)
+            fields['co_nlocals'] = len(fields['co_varnames'])
+        else:
+            fields['co_varnames'] = self.load()
+            fields['co_freevars'] = self.load()
+            fields['co_cellvars'] = self.load()
+
+        fields['co_filename'] = self.load()
+        fields['co_name'] = self.load()
+        if major >= 3 and minor >= 11:
+            fields['co_qualname'] = self.load()
+        fields['co_firstlineno'] = self._int32()
+
+        if major >= 3 and minor >= 10:
+            fields['co_linetable'] = self.load()
+        else:
+            fields['co_lnotab'] = self.load()
+        if major >= 3 and minor >= 11:
+            fields['co_exceptiontable'] = self.load()
+
+        return Code(**fields)
+
+
+def loads(data, version):
+    """从bytes-like对象反序列化一个对象，version为写出数据的Python版本(major, minor)"""
+    return MarshalReader(data, version).load()
@@ -0,0 +1,76 @@
+import re
+
+
+CRYPT_BLOCK_SIZE = 16
+
+# 保存密钥的模块
+KEY_MODULE = 'pyimod00_crypto_key'
+
+# 原始扫描时识别的marshal字符串记录：短字符串为1字节长度，其余为4字节小端长度(可带FLAG_REF)
+_SHORT_STRING = re.compile(rb'[zZ\xfa\xda]([\x01-\x20])')
+_STRING = re.compile(rb'[satuA\xf3\xe1\xf4\xf5\xc1]([\x01-\x20])\x00\x00\x00')
+
+
+def looks_like_zlib(data):
+    """根据两字节头判断数据是否为zlib流(如0x78 0x9C/0x78 0xDA)，用于不解压地识别加密成员或验证试解密结果"""
+    return len(data) >= 2 and data[0] & 0x0f == 8 and not data[1] & 0x20 and ((data[0] << 8) | data[1]) % 31 == 0
+
+
+def pad_key(key):
+    """将密钥转换为bytes，与PyInstaller构建时一致，不足16字节的密钥在左侧补'0'"""
+    if isinstance(key, str):
+        key = key.encode('utf-8')
+    key = bytes(key)
+    if 0 < len(key) < CRYPT_BLOCK_SIZE:
+        key = key.rjust(CRYPT_BLOCK_SIZE, b'0')
+    return key
+
+
+def iter_code_strings(code):
+    """深度优先遍历代码对象(含嵌套代码对象)中的字符串常量，宿主代码对象与pymarshal.Code均可"""
+    for const in code.co_consts:
+        if hasattr(const, 'co_consts'):
+            yield from iter_code_strings(const)
+        elif isinstance(const, (str, bytes)):
+            yield const
+        elif isinstance(const, (tuple, frozenset)):
+            yield from (item for item in const if isinstance(item, (str, bytes)))
+
+
+def iter_raw_strings(data):
+    """不反序列化地扫描marshal数据中的短字符串记录，用于魔数未知或数据已损坏的模块"""
+    for pattern in (_SHORT_STRING, _STRING):
+        for match in pattern.finditer(data):
+            start = match.end()
+            value = data[start:start + match.group(1)[0]]
+            if len(value) == match.group(1)[0] and value.isascii() and value.decode('ascii').isprintable():
+                yield value
+
+
+def key_variants(value, any_length):
+    """由一个字符串常量得到候选密钥：PyInstaller只使用前16字节，不足16字节时左侧补'0'(见pad_key)"""
+    if isinstance(value, str):
+        try:
+            value = value.encode('ascii')
+        except UnicodeEncodeError:
+            return
+    if (any_length and 0 < len(value) <= 32) or len(value) in (16, 24, 32):
+        yield value
+        if len(value) > 16:
+            yield value[:16]
+
+
+def iter_module_keys(data, load, any_length=False):
+    """
+    读取一个模块中可能是AES密钥的字符串常量
+
+    load(data)将data反序列化为代码对象，失败时改为原始扫描；any_length为True(密钥模块)时
+    任意长度不超过32的字符串都是候选，否则只取16/24/32字节的字符串
+    """
+    try:
+        strings = list(iter_code_strings(load(data)))
+    except Exception:
+        strings = list(iter_raw_strings(data))
+
+    for value in strings:
+        yield from key_variants(value, any_length)